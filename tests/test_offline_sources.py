@@ -0,0 +1,197 @@
+"""
+离线数据源测试：PubMed efetch XML 解析与站点地图发现
+
+不访问网络、不启动浏览器：PubMed 使用 OfflinePubMedClient 读取样例XML，
+站点地图写入临时目录后通过 file:// 读取。
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ukbiobank_scraper import (  # noqa: E402
+    OfflinePubMedClient, Publication, SitemapReader, UKBiobankScraperSelenium,
+    load_publications_csv, normalize_publication_link
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+EFETCH_SAMPLE = os.path.join(FIXTURES, 'efetch_sample.xml')
+BASE_URL = 'https://www.ukbiobank.ac.uk/discoveries-and-impact/publications/'
+
+URLSET = '''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</urlset>
+'''
+SITEMAP_INDEX = '''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</sitemapindex>
+'''
+
+
+def _url(loc, lastmod=''):
+    return f'<url><loc>{loc}</loc>' + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '') + '</url>'
+
+
+def _make_scraper():
+    """创建不启动浏览器的爬虫实例（'cdp' 模式不初始化 WebDriver）"""
+    scraper = UKBiobankScraperSelenium(headless=True, browser_mode='cdp')
+    scraper.supervisor.stop()
+    return scraper
+
+
+class OfflinePubMedClientTest(unittest.TestCase):
+
+    def test_parse_efetch_fields(self):
+        records = OfflinePubMedClient(EFETCH_SAMPLE).fetch(['37460270', '31234567', '30000001'])
+        self.assertEqual(records['37460270'], {
+            'authors': 'Sun BB, Chiou J, Alnylam Human Genetics',
+            'journal': 'Nature medicine',
+            'publish_date': '7 July 2023',
+            'doi': '10.1038/s41586-023-06592-6',
+            'abstract': 'Proteins are key drivers. We profiled 1,463 proteins.',
+        })
+        # 没有 ArticleId 时回退到 ELocationID；MedlineDate 原样保留
+        self.assertEqual(records['31234567']['doi'], '10.1093/ije/dyz001')
+        self.assertEqual(records['31234567']['publish_date'], '2019 Nov-Dec')
+        # 数字月份转为月份名
+        self.assertEqual(records['30000001']['publish_date'], 'March 2021')
+        self.assertEqual(records['30000001']['abstract'], '')
+
+    def test_fetch_skips_unknown_and_invalid_ids(self):
+        client = OfflinePubMedClient(EFETCH_SAMPLE, batch_size=2)
+        records = client.fetch(['37460270', ' 31234567 ', '99999999', 'abc', ''])
+        self.assertEqual(sorted(records), ['31234567', '37460270'])
+        self.assertEqual(client.requests_made, 2)
+
+    def test_enrich_fills_missing_fields_only(self):
+        scraper = _make_scraper()
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_filename = os.path.join(tmp, 'publications.csv')
+            scraper.upsert_many_to_csv([
+                Publication(link=BASE_URL + 'a/', pubmed_id='37460270', authors='Site Authors',
+                            details_saved='否'),
+                Publication(link=BASE_URL + 'b/', pubmed_id='', details_saved='否'),
+            ], csv_filename)
+            scraper.pubmed_client = OfflinePubMedClient(EFETCH_SAMPLE)
+
+            stats = scraper.enrich_from_pubmed(csv_filename)
+
+            rows = {pub.link: pub for pub in load_publications_csv(csv_filename)}
+            self.assertEqual(stats['candidates'], 1)
+            enriched = rows[BASE_URL + 'a/']
+            self.assertEqual(enriched.authors, 'Site Authors')
+            self.assertEqual(enriched.journal, 'Nature medicine')
+            self.assertEqual(enriched.doi, '10.1038/s41586-023-06592-6')
+            # 补全不改变完成标记，详情页仍需渲染
+            self.assertEqual(enriched.details_saved, '否')
+            self.assertEqual(rows[BASE_URL + 'b/'].journal, '')
+
+    def test_enrich_requests_each_pmid_once(self):
+        scraper = _make_scraper()
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_filename = os.path.join(tmp, 'publications.csv')
+            # PubMed 同样没有摘要和DOI，补全后仍缺失
+            scraper.upsert_many_to_csv([Publication(link=BASE_URL + 'c/', pubmed_id='30000001')], csv_filename)
+            scraper.pubmed_client = OfflinePubMedClient(EFETCH_SAMPLE)
+
+            first = scraper.enrich_from_pubmed(csv_filename)
+            second = scraper.enrich_from_pubmed(csv_filename)
+
+            self.assertEqual((first['candidates'], first['filled_fields']), (1, 2))
+            self.assertEqual((second['candidates'], second['skipped']), (0, 1))
+            self.assertEqual(scraper.pubmed_client.requests_made, 1)
+            # 只处理指定链接
+            self.assertEqual(scraper.enrich_from_pubmed(csv_filename, links=set())['candidates'], 0)
+
+
+class SitemapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        with open(os.path.join(self.root, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return 'file://' + os.path.join(self.root, name)
+
+    def _nested_sitemap(self, publication_urls):
+        """wp-sitemap.xml -> publication 子索引 -> 两个 urlset，另有一个不相关的页面站点地图"""
+        half = len(publication_urls) // 2
+        part1 = self._write('wp-sitemap-posts-publication-1.xml', URLSET.format('\n'.join(publication_urls[:half])))
+        part2 = self._write('wp-sitemap-posts-publication-2.xml', URLSET.format('\n'.join(publication_urls[half:])))
+        nested = self._write('wp-sitemap-publication-index.xml', SITEMAP_INDEX.format(
+            f'<sitemap><loc>{part1}</loc></sitemap><sitemap><loc>{part2}</loc></sitemap>'))
+        pages = self._write('wp-sitemap-posts-page-1.xml', URLSET.format(_url('https://www.ukbiobank.ac.uk/about/')))
+        return self._write('wp-sitemap.xml', SITEMAP_INDEX.format(
+            f'<sitemap><loc>{pages}</loc></sitemap><sitemap><loc>{nested}</loc></sitemap>'))
+
+    def test_reader_expands_nested_index(self):
+        sitemap_url = self._nested_sitemap([
+            _url(BASE_URL + 'a/', '2024-01-01T00:00:00+00:00'),
+            _url(BASE_URL + 'b/'),
+            _url(BASE_URL + 'c/', '2023-05-06'),
+        ])
+        reader = SitemapReader()
+        urls = list(reader.iter_urls(sitemap_url))
+        self.assertEqual(urls, [
+            (BASE_URL + 'a/', '2024-01-01T00:00:00+00:00'),
+            (BASE_URL + 'b/', ''),
+            (BASE_URL + 'c/', '2023-05-06'),
+        ])
+        # 只展开 publication 子站点地图：根索引 + 子索引 + 两个 urlset
+        self.assertEqual(reader.fetch_count, 4)
+
+    def test_normalize_publication_link(self):
+        self.assertEqual(normalize_publication_link('/discoveries-and-impact/publications/a'), BASE_URL + 'a/')
+        self.assertEqual(normalize_publication_link('HTTP://WWW.UKBIOBANK.AC.UK/discoveries-and-impact/publications/a/?x=1#top'),
+                         BASE_URL + 'a/')
+        self.assertEqual(normalize_publication_link('mailto:someone@example.com'), '')
+
+    def test_discover_normalizes_and_filters_by_date(self):
+        sitemap_url = self._nested_sitemap([
+            _url(BASE_URL),  # 列表页本身
+            _url(BASE_URL + 'a/', '2024-01-01T00:00:00+00:00'),
+            _url('http://www.ukbiobank.ac.uk/discoveries-and-impact/publications/a', '2024-01-01T00:00:00+00:00'),
+            _url(BASE_URL + 'b', '2023-02-01T00:00:00+00:00'),
+            _url(BASE_URL + 'old/', '2019-06-30T00:00:00+00:00'),
+        ])
+        scraper = _make_scraper()
+        csv_filename = os.path.join(self.root, 'publications.csv')
+        # 旧版本写入的未规范化链接不应产生重复记录
+        scraper.upsert_many_to_csv([Publication(link=BASE_URL + 'b', title='B', details_saved='是')], csv_filename)
+
+        stats = scraper.discover_from_sitemap(csv_filename, sitemap_url)
+
+        self.assertTrue(stats['success'])
+        self.assertEqual((stats['total'], stats['new'], stats['unchanged'], stats['filtered']), (2, 1, 1, 1))
+        links = sorted(pub.link for pub in load_publications_csv(csv_filename))
+        self.assertEqual(links, [BASE_URL + 'a/', BASE_URL + 'b'])
+
+    def test_detail_date_filter_excludes_sitemap_link(self):
+        sitemap_url = self._nested_sitemap([_url(BASE_URL + 'a/'), _url(BASE_URL + 'old/')])
+        scraper = _make_scraper()
+        csv_filename = os.path.join(self.root, 'publications.csv')
+        scraper.discover_from_sitemap(csv_filename, sitemap_url)
+
+        html = ('<html><h1>Old</h1><header class="articleHeader"><div class="articleHeader__meta">'
+                '<div class="meta__item"><dt>Publish date</dt><dd>5 June 2018</dd></div></div></header></html>')
+        pending = {pub.link: pub for pub in load_publications_csv(csv_filename)}
+        self.assertTrue(scraper._process_detail_html(pending[BASE_URL + 'old/'], html, csv_filename))
+
+        self.assertEqual([pub.link for pub in load_publications_csv(csv_filename)], [BASE_URL + 'a/'])
+        # 之后读取站点地图时直接跳过已排除的链接
+        stats = scraper.discover_from_sitemap(csv_filename, sitemap_url)
+        self.assertEqual((stats['total'], stats['new'], stats['filtered']), (1, 0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,27 +27,1980 @@ from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import json
 import csv
+import re
 import time
+import asyncio
+import random
+import queue
+import shutil
+import sqlite3
+import tempfile
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import unicodedata
+import gzip
+import hashlib
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 
 
+# 隐藏 navigator.webdriver 标志的注入脚本
+HIDE_WEBDRIVER_SCRIPT = '''
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    })
+'''
+
+# 出版物记录的固定字段（同时也是CSV列顺序）
+PUBLICATION_FIELDS = ['page', 'title', 'link', 'disease_areas', 'last_updated', 'authors',
+                      'publish_date', 'journal', 'pubmed_id', 'doi', 'abstract', 'details_saved']
+
+# 高重复度的分类字段，写入时做字符串驻留以共享同一对象
+_INTERNED_FIELDS = frozenset(['page', 'last_updated', 'publish_date', 'journal', 'details_saved'])
+
+
+class Publication:
+    """
+    出版物记录（固定字段，使用__slots__）
+
+    期刊、疾病领域等重复度高的字段做字符串驻留，disease_areas 统一存为元组，
+    写CSV时再用 '; ' 拼接。支持 pub['title'] / pub.get('title') 的字典式访问。
+    """
+
+    __slots__ = tuple(PUBLICATION_FIELDS)
+
+    def __init__(self, **fields):
+        for key in PUBLICATION_FIELDS:
+            object.__setattr__(self, key, '')
+        self.disease_areas = ()
+        self.update(fields)
+
+    @staticmethod
+    def _normalize(key: str, value):
+        """按字段规范化取值"""
+        if key == 'disease_areas':
+            if not value:
+                return ()
+            if isinstance(value, str):
+                value = value.split(';')
+            return tuple(sys.intern(v.strip()) for v in value if v and v.strip())
+        value = '' if value is None else str(value)
+        if key in _INTERNED_FIELDS:
+            return sys.intern(value)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key not in PUBLICATION_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, self._normalize(key, value))
+
+    def __getitem__(self, key: str):
+        if key not in PUBLICATION_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in PUBLICATION_FIELDS
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Publication):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in PUBLICATION_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Publication(link={self.link!r}, title={self.title[:40]!r})"
+
+    def get(self, key: str, default=None):
+        """字典式取值，未知字段返回默认值"""
+        if key not in PUBLICATION_FIELDS:
+            return default
+        return getattr(self, key)
+
+    def update(self, fields: Dict):
+        """批量设置字段（忽略未知字段）"""
+        for key, value in fields.items():
+            if key in PUBLICATION_FIELDS:
+                setattr(self, key, self._normalize(key, value))
+
+    def merge(self, other: 'Publication'):
+        """用另一条记录中的非空字段覆盖本记录（空值不会清空已有字段）"""
+        for key in PUBLICATION_FIELDS:
+            value = getattr(other, key)
+            if value not in ('', ()):
+                setattr(self, key, value)
+
+    def copy(self) -> 'Publication':
+        pub = Publication.__new__(Publication)
+        for key in PUBLICATION_FIELDS:
+            object.__setattr__(pub, key, getattr(self, key))
+        return pub
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'Publication':
+        """从CSV行或字典创建记录"""
+        return cls(**{k: v for k, v in row.items() if k in PUBLICATION_FIELDS})
+
+    def to_row(self) -> Dict[str, str]:
+        """转换为CSV行（疾病领域用分号拼接）"""
+        row = {k: getattr(self, k) for k in PUBLICATION_FIELDS}
+        row['disease_areas'] = '; '.join(self.disease_areas)
+        return row
+
+    def to_dict(self) -> Dict:
+        """转换为JSON字典（疾病领域保持数组）"""
+        data = {k: getattr(self, k) for k in PUBLICATION_FIELDS}
+        data['disease_areas'] = list(self.disease_areas)
+        return data
+
+
+def load_publications_csv(filename: str) -> List[Publication]:
+    """读取CSV文件中的全部出版物记录"""
+    publications = []
+    if os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                publications.append(Publication.from_row(row))
+    return publications
+
+
+def normalize_publication_link(href: str, site_root: str = 'https://www.ukbiobank.ac.uk') -> str:
+    """
+    规范化文章链接（列表页与站点地图共用，作为CSV中的去重键）
+
+    相对路径补全站点地址；统一为 https、小写域名、路径以 / 结尾，去掉查询参数和锚点。
+    无法识别的链接返回空字符串。
+    """
+    href = (href or '').strip()
+    if href.startswith('/'):
+        href = site_root.rstrip('/') + href
+    parts = urllib.parse.urlsplit(href)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return ''
+    path = parts.path if parts.path.endswith('/') else parts.path + '/'
+    return urllib.parse.urlunsplit(('https', parts.netloc.lower(), path, '', ''))
+
+
+class RetryTracker:
+    """按链接记录详情获取的重试状态（指数退避 + 抖动），多次失败后转入死信表"""
+
+    DEAD_LETTER_FIELDS = ['link', 'title', 'attempts', 'last_error', 'dead_at']
+
+    def __init__(self, state_filename: str, dead_letter_filename: str, max_attempts: int = 5,
+                 base_delay: float = 30.0, max_delay: float = 6 * 3600.0):
+        self.state_filename = state_filename
+        self.dead_letter_filename = dead_letter_filename
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.state = {}        # link -> {'attempts', 'last_error', 'next_eligible', 'last_attempt'}
+        self.dead_letter = {}  # link -> 死信记录
+        self._load()
+
+    def _load(self):
+        """加载重试状态与死信表"""
+        if os.path.exists(self.state_filename):
+            try:
+                with open(self.state_filename, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f).get('links', {})
+            except Exception as e:
+                print(f"加载重试状态失败: {e}")
+                self.state = {}
+        if os.path.exists(self.dead_letter_filename):
+            try:
+                with open(self.dead_letter_filename, 'r', encoding='utf-8-sig', newline='') as f:
+                    for row in csv.DictReader(f):
+                        if row.get('link'):
+                            self.dead_letter[row['link']] = row
+            except Exception as e:
+                print(f"加载死信表失败: {e}")
+
+    def _save(self):
+        """保存重试状态与死信表（调用方需持有锁）"""
+        try:
+            with open(self.state_filename, 'w', encoding='utf-8') as f:
+                json.dump({'links': self.state}, f, ensure_ascii=False, indent=2)
+            with open(self.dead_letter_filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.DEAD_LETTER_FIELDS)
+                writer.writeheader()
+                for row in self.dead_letter.values():
+                    writer.writerow({k: row.get(k, '') for k in self.DEAD_LETTER_FIELDS})
+        except Exception as e:
+            print(f"保存重试状态失败: {e}")
+
+    def is_eligible(self, link: str, now: float = None) -> bool:
+        """链接当前是否允许重试（未进入死信表且已过退避时间）"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if link in self.dead_letter:
+                return False
+            entry = self.state.get(link)
+            return not entry or entry.get('next_eligible', 0) <= now
+
+    def attempts(self, link: str) -> int:
+        """返回链接已失败的次数"""
+        with self.lock:
+            return self.state.get(link, {}).get('attempts', 0)
+
+    def record_success(self, link: str):
+        """成功后清除该链接的重试状态"""
+        with self.lock:
+            if self.state.pop(link, None) is not None:
+                self._save()
+
+    def record_failure(self, link: str, error: str, title: str = '') -> bool:
+        """
+        记录一次失败并计算下次可重试时间
+
+        Returns:
+            该链接是否已转入死信表
+        """
+        with self.lock:
+            entry = self.state.get(link, {'attempts': 0})
+            entry['attempts'] = entry.get('attempts', 0) + 1
+            entry['last_error'] = str(error)[:500]
+            entry['last_attempt'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            if entry['attempts'] >= self.max_attempts:
+                self.state.pop(link, None)
+                self.dead_letter[link] = {
+                    'link': link,
+                    'title': title,
+                    'attempts': entry['attempts'],
+                    'last_error': entry['last_error'],
+                    'dead_at': entry['last_attempt']
+                }
+                self._save()
+                return True
+
+            # 指数退避 + 全抖动：base * 2^(n-1)，取 [delay/2, delay] 之间的随机值
+            delay = min(self.max_delay, self.base_delay * (2 ** (entry['attempts'] - 1)))
+            entry['next_eligible'] = time.time() + random.uniform(delay / 2, delay)
+            self.state[link] = entry
+            self._save()
+            return False
+
+
+class ContentFingerprints:
+    """
+    按链接保存详情页内容指纹（articleHeader 与摘要区域的规范化文本哈希）
+
+    指纹只在字段成功提取并写入CSV后更新，因此指纹相同说明CSV中的记录
+    与页面内容一致，可以跳过提取和写入。
+    """
+
+    def __init__(self, state_filename: str, save_every: int = 50):
+        self.state_filename = state_filename
+        self.save_every = save_every
+        self.lock = threading.Lock()
+        self.hashes = {}  # link -> {'hash', 'updated_at'}
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+        self._dirty = 0
+        if os.path.exists(state_filename):
+            try:
+                with open(state_filename, 'r', encoding='utf-8') as f:
+                    self.hashes = json.load(f).get('links', {})
+            except Exception as e:
+                print(f"加载内容指纹失败: {e}")
+
+    @staticmethod
+    def fingerprint(article_header, abstract_parts: List[str]) -> str:
+        """规范化（NFKC、合并空白）后计算 SHA-256，忽略标签结构和属性的变化"""
+        header_text = article_header.get_text(' ', strip=True)
+        text = ' '.join(header_text.split()) + '\n' + ' '.join(' '.join(abstract_parts).split())
+        return hashlib.sha256(unicodedata.normalize('NFKC', text).encode('utf-8')).hexdigest()
+
+    def compare(self, link: str, digest: str) -> str:
+        """与已保存的指纹比较，返回 'new' / 'changed' / 'unchanged'"""
+        with self.lock:
+            stored = self.hashes.get(link)
+        if not stored:
+            return 'new'
+        return 'unchanged' if stored.get('hash') == digest else 'changed'
+
+    def count(self, result: str):
+        """统计本轮的对比结果"""
+        with self.lock:
+            self.stats[result] += 1
+
+    def update(self, link: str, digest: str):
+        """记录已写入CSV的内容指纹（批量落盘）"""
+        with self.lock:
+            self.hashes[link] = {'hash': digest, 'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            self._dirty += 1
+            if self._dirty >= self.save_every:
+                self._save()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def save(self):
+        with self.lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        """保存指纹（调用方需持有锁）"""
+        try:
+            with open(self.state_filename, 'w', encoding='utf-8') as f:
+                json.dump({'links': self.hashes}, f, ensure_ascii=False)
+            self._dirty = 0
+        except Exception as e:
+            print(f"保存内容指纹失败: {e}")
+
+
+class CrawlScheduler:
+    """
+    持久化的抓取任务优先级队列
+
+    任务分四类：'listing'（列表页）、'detail'（未获取详情的文章）、'recheck'
+    （已完成但缺字段的文章）、'refresh'（定期刷新的已完成文章）。每次运行根据当前CSV/进度重新计算候选任务的分数，
+    并结合持久化的历史（运行次数、失败次数、平均耗时）调整排序：
+
+    - listing: 越新的页（页码越小）分越高，曾失败的页略加分
+    - detail: 基础分高于 recheck，越新的页分越高
+    - recheck: 缺摘要/DOI/PMID 和 last_updated 越旧分越高，每重查一次扣分
+    - refresh: 分数最低，只在其它任务之后按新旧程度处理
+    - 失败次数越多扣分越多，避免反复在坏链接上浪费预算
+    """
+
+    DEFAULT_COST = {'listing': 5.0, 'detail': 4.0, 'recheck': 4.0, 'refresh': 4.0}
+
+    def __init__(self, state_filename: str):
+        self.state_filename = state_filename
+        self.lock = threading.Lock()
+        self.items = {}    # 'kind:key' -> {'kind', 'key', 'score', 'reasons', 'runs', 'failures', 'last_run'}
+        self.costs = dict(self.DEFAULT_COST)  # kind -> 平均耗时（秒，指数滑动平均）
+        if os.path.exists(state_filename):
+            try:
+                with open(state_filename, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                self.items = state.get('items', {})
+                self.costs.update(state.get('costs', {}))
+            except Exception as e:
+                print(f"加载调度状态失败: {e}")
+
+    def save(self):
+        """保存调度状态（每个阶段结束时调用一次，避免逐任务重写整个文件）"""
+        with self.lock:
+            try:
+                with open(self.state_filename, 'w', encoding='utf-8') as f:
+                    json.dump({'items': self.items, 'costs': self.costs,
+                               'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                              f, ensure_ascii=False)
+            except Exception as e:
+                print(f"保存调度状态失败: {e}")
+
+    @staticmethod
+    def _recency(page, max_page: int) -> float:
+        """页码越小（越新）越接近1，未知页码取0.5"""
+        try:
+            page = int(page)
+        except (TypeError, ValueError):
+            return 0.5
+        return max(0.0, 1.0 - (page - 1) / max(max_page - 1, 1))
+
+    @staticmethod
+    def _age_days(date_text: str) -> float:
+        for fmt in ('%d %B %Y', '%d %b %Y'):
+            try:
+                return (datetime.now() - datetime.strptime(date_text.strip(), fmt)).days
+            except (ValueError, AttributeError):
+                continue
+        return 0.0
+
+    def _history(self, kind: str, key) -> Dict:
+        return self.items.get(f'{kind}:{key}', {'runs': 0, 'failures': 0, 'last_run': ''})
+
+    def _put(self, kind: str, key, score: float, reasons: List[str], extra_failures: int = 0):
+        history = self._history(kind, key)
+        failures = max(history.get('failures', 0), extra_failures)
+        score -= 12 * failures
+        if kind == 'recheck':
+            score -= 8 * history.get('runs', 0)
+        self.items[f'{kind}:{key}'] = {
+            'kind': kind, 'key': key, 'score': round(score, 2), 'reasons': reasons,
+            'runs': history.get('runs', 0), 'failures': failures, 'last_run': history.get('last_run', '')
+        }
+
+    def plan_listing(self, pages: List[int], total_pages: int, failed_pages=()) -> List[int]:
+        """为待处理列表页打分，返回按优先级排序的页码"""
+        failed_pages = set(failed_pages)
+        with self.lock:
+            self._drop_missing('listing', set(pages))
+            for page in pages:
+                reasons = ['newest'] if page <= 3 else []
+                score = 60 + 40 * self._recency(page, total_pages)
+                if page in failed_pages:
+                    score += 10
+                    reasons.append('retry_failed')
+                self._put('listing', page, score, reasons)
+            ordered = sorted(pages, key=lambda p: -self.items[f'listing:{p}']['score'])
+        return ordered
+
+    def plan_details(self, publications: List, recheck: bool = False, failure_counts: Dict = None,
+                     refresh: bool = False) -> List:
+        """
+        为文章任务打分，返回 [(kind, Publication), ...]（按优先级排序）
+
+        Args:
+            publications: CSV中的全部记录
+            recheck: 是否纳入已完成但缺字段的记录
+            failure_counts: link -> 历史失败次数（来自重试状态）
+            refresh: 是否纳入全部已完成记录（内容指纹未变化的会被快速跳过）
+        """
+        failure_counts = failure_counts or {}
+        pages = [int(p.page) for p in publications if str(p.page).isdigit()]
+        max_page = max(pages) if pages else 1
+        planned = []
+        with self.lock:
+            wanted = {'detail': set(), 'recheck': set(), 'refresh': set()}
+            for pub in publications:
+                if not pub.link:
+                    continue
+                recency = self._recency(pub.page, max_page)
+                if pub.details_saved.strip() in ['', '否', 'No', 'False', '0']:
+                    kind, score, reasons = 'detail', 70 + 20 * recency, ['missing_details']
+                elif recheck or refresh:
+                    reasons = []
+                    score = 30 + 10 * recency
+                    if not pub.abstract or pub.abstract in ['未找到摘要', '获取失败']:
+                        score += 15
+                        reasons.append('missing_abstract')
+                    if not pub.doi:
+                        score += 8
+                        reasons.append('missing_doi')
+                    if not pub.pubmed_id:
+                        score += 8
+                        reasons.append('missing_pmid')
+                    age = self._age_days(pub.last_updated)
+                    if recheck and reasons:
+                        kind = 'recheck'
+                    elif refresh:
+                        kind, score, reasons = 'refresh', 10 + 10 * recency, ['refresh']
+                    else:
+                        continue
+                    if age > 365:
+                        score += min(15, age / 60)
+                        reasons.append('stale')
+                else:
+                    continue
+                wanted[kind].add(pub.link)
+                self._put(kind, pub.link, score, reasons, failure_counts.get(pub.link, 0))
+                planned.append((kind, pub))
+            self._drop_missing('detail', wanted['detail'])
+            self._drop_missing('recheck', wanted['recheck'])
+            self._drop_missing('refresh', wanted['refresh'])
+            planned.sort(key=lambda item: -self.items[f'{item[0]}:{item[1].link}']['score'])
+        return planned
+
+    def _drop_missing(self, kind: str, keys: set):
+        """移除已不再需要的任务（调用方需持有锁）"""
+        for item_id in [i for i, item in self.items.items() if item['kind'] == kind and item['key'] not in keys]:
+            del self.items[item_id]
+
+    def kind_for(self, link: str) -> str:
+        """文章链接对应的任务类型（'detail'、'recheck' 或 'refresh'）"""
+        with self.lock:
+            for kind in ('detail', 'recheck', 'refresh'):
+                if f'{kind}:{link}' in self.items:
+                    return kind
+            return 'detail'
+
+    def record(self, kind: str, key, success: bool, duration: float = None):
+        """记录一次执行结果与耗时"""
+        with self.lock:
+            item = self.items.get(f'{kind}:{key}')
+            if item:
+                item['runs'] = item.get('runs', 0) + 1
+                if not success:
+                    item['failures'] = item.get('failures', 0) + 1
+                item['last_run'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if duration is not None and success:
+                self.costs[kind] = round(0.8 * self.costs.get(kind, duration) + 0.2 * duration, 3)
+
+    def estimate(self, kind: str) -> float:
+        """任务的预计耗时（秒）"""
+        return self.costs.get(kind, self.DEFAULT_COST.get(kind, 5.0))
+
+
+class CircuitBreaker:
+    """全局熔断器：滑动窗口内错误率过高时暂停所有工作线程"""
+
+    def __init__(self, window_seconds: float = 60.0, min_requests: int = 10,
+                 error_rate_threshold: float = 0.5, cooldown: float = 60.0, max_cooldown: float = 900.0,
+                 probe_timeout: float = 120.0):
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.outcomes = deque()  # (timestamp, success)
+        self.state = 'closed'    # closed / open / half_open
+        self.open_until = 0.0
+        self.probe_timeout = probe_timeout  # 半开状态下试探请求迟迟没有结果时，允许再放行一个
+        self.probe_deadline = 0.0
+
+    def _trim(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    def wait_until_closed(self, should_stop=lambda: False) -> bool:
+        """
+        熔断打开时阻塞，直到冷却结束或收到停止信号
+
+        冷却结束后只放行一个试探请求，其余线程继续等待，直到 record() 根据试探结果
+        关闭或重新打开熔断器。
+
+        Returns:
+            是否允许继续请求
+        """
+        while not should_stop():
+            with self.lock:
+                if self.state == 'closed':
+                    return True
+                now = time.time()
+                if self.state == 'open':
+                    remaining = self.open_until - now
+                    if remaining <= 0:
+                        # 冷却结束，进入半开状态，由当前线程发出试探请求
+                        self.state = 'half_open'
+                        self.probe_deadline = now + self.probe_timeout
+                        print("熔断器进入半开状态，开始试探请求")
+                        return True
+                else:
+                    remaining = self.probe_deadline - now
+                    if remaining <= 0:
+                        # 试探请求未记录结果（如线程异常退出），再放行一个
+                        self.probe_deadline = now + self.probe_timeout
+                        return True
+            time.sleep(min(1.0, max(remaining, 0.1)))
+        return False
+
+    def record(self, success: bool):
+        """记录一次请求结果"""
+        now = time.time()
+        with self.lock:
+            if self.state == 'half_open':
+                if success:
+                    self.state = 'closed'
+                    self.cooldown = self.base_cooldown
+                    self.outcomes.clear()
+                    print("熔断器已关闭，恢复正常请求")
+                else:
+                    self._open(now, escalate=True)
+                return
+
+            self.outcomes.append((now, success))
+            self._trim(now)
+            if self.state == 'closed' and len(self.outcomes) >= self.min_requests:
+                failures = sum(1 for _, ok in self.outcomes if not ok)
+                error_rate = failures / len(self.outcomes)
+                if error_rate >= self.error_rate_threshold:
+                    self._open(now)
+
+    def _open(self, now: float, escalate: bool = False):
+        """打开熔断器（调用方需持有锁）"""
+        if escalate:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        self.state = 'open'
+        self.open_until = now + self.cooldown
+        self.outcomes.clear()
+        print(f"⚠ 错误率过高，熔断器打开，暂停请求 {self.cooldown:.0f} 秒")
+
+
+class PubMedClient:
+    """通过 E-utilities efetch 接口按PMID批量获取PubMed元数据"""
+
+    DEFAULT_BASE_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+    MONTHS = {
+        'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
+        'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
+        'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December'
+    }
+
+    def __init__(self, base_url: str = None, batch_size: int = 200, api_key: str = None,
+                 timeout: float = 30.0, min_interval: float = 0.34):
+        """
+        Args:
+            base_url: E-utilities 兼容接口地址（可指向本地替身服务）
+            batch_size: 每次请求的PMID数量
+            api_key: NCBI API Key（可选，有则可提高限速）
+            timeout: 请求超时（秒）
+            min_interval: 两次请求之间的最小间隔（无Key时NCBI限制为每秒3次）
+        """
+        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip('/') + '/'
+        self.batch_size = batch_size
+        self.api_key = api_key
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._last_request = 0.0
+        self.failed_ids = set()
+
+    def fetch(self, pmids: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        批量获取元数据
+
+        Returns:
+            {pmid: {'authors', 'journal', 'publish_date', 'doi', 'abstract'}}
+        """
+        ids = sorted(set(p.strip() for p in pmids if p and p.strip().isdigit()))
+        results = {}
+        self.failed_ids = set()  # 本次请求失败的PMID（调用方据此决定是否稍后重试）
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            try:
+                results.update(self.parse_efetch_xml(self._fetch_batch(batch)))
+            except Exception as e:
+                print(f"PubMed批量请求失败（{len(batch)} 个PMID）: {e}")
+                self.failed_ids.update(batch)
+        return results
+
+    def _fetch_batch(self, pmids: List[str]) -> str:
+        """POST 一批PMID到 efetch，返回XML文本"""
+        wait = self.min_interval - (time.time() - self._last_request)
+        if wait > 0:
+            time.sleep(wait)
+        params = {'db': 'pubmed', 'retmode': 'xml', 'id': ','.join(pmids)}
+        if self.api_key:
+            params['api_key'] = self.api_key
+        request = urllib.request.Request(
+            self.base_url + 'efetch.fcgi',
+            data=urllib.parse.urlencode(params).encode('utf-8')
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read().decode('utf-8')
+        finally:
+            self._last_request = time.time()
+
+    @classmethod
+    def _format_pub_date(cls, date_elem) -> str:
+        """把 PubDate 转为站点使用的 '17 July 2023' 格式"""
+        if date_elem is None:
+            return ''
+        medline = date_elem.findtext('MedlineDate')
+        if medline:
+            return medline.strip()
+        year = (date_elem.findtext('Year') or '').strip()
+        month = (date_elem.findtext('Month') or '').strip()
+        day = (date_elem.findtext('Day') or '').strip()
+        if month.isdigit():
+            month = list(cls.MONTHS.values())[int(month) - 1] if 1 <= int(month) <= 12 else ''
+        else:
+            month = cls.MONTHS.get(month[:3].lower(), month)
+        return ' '.join(part for part in [day.lstrip('0'), month, year] if part)
+
+    @classmethod
+    def parse_efetch_xml(cls, xml_text: str) -> Dict[str, Dict[str, str]]:
+        """解析 efetch 返回的 PubmedArticleSet"""
+        results = {}
+        root = ET.fromstring(xml_text)
+        for article in root.iter('PubmedArticle'):
+            pmid = (article.findtext('MedlineCitation/PMID') or '').strip()
+            art = article.find('MedlineCitation/Article')
+            if not pmid or art is None:
+                continue
+
+            authors = []
+            for author in art.findall('AuthorList/Author'):
+                collective = author.findtext('CollectiveName')
+                if collective:
+                    authors.append(collective.strip())
+                    continue
+                name = ' '.join(p for p in [author.findtext('LastName'), author.findtext('Initials')] if p)
+                if name:
+                    authors.append(name)
+
+            doi = ''
+            for article_id in article.findall('PubmedData/ArticleIdList/ArticleId'):
+                if article_id.get('IdType') == 'doi' and article_id.text:
+                    doi = article_id.text.strip()
+                    break
+            if not doi:
+                for eloc in art.findall('ELocationID'):
+                    if eloc.get('EIdType') == 'doi' and eloc.text:
+                        doi = eloc.text.strip()
+                        break
+
+            abstract_parts = [' '.join(''.join(part.itertext()).split())
+                              for part in art.findall('Abstract/AbstractText')]
+
+            results[pmid] = {
+                'authors': ', '.join(authors),
+                'journal': ' '.join((art.findtext('Journal/Title') or '').split()),
+                'publish_date': cls._format_pub_date(art.find('Journal/JournalIssue/PubDate')),
+                'doi': doi,
+                'abstract': ' '.join(p for p in abstract_parts if p)
+            }
+        return results
+
+
+class OfflinePubMedClient(PubMedClient):
+    """离线替身：从本地 efetch XML 文件（或目录）读取元数据，用于测试"""
+
+    def __init__(self, xml_path: str, batch_size: int = 200):
+        super().__init__(base_url='file:///', batch_size=batch_size, min_interval=0)
+        self.records = {}
+        paths = [xml_path]
+        if os.path.isdir(xml_path):
+            paths = [os.path.join(xml_path, name) for name in sorted(os.listdir(xml_path)) if name.endswith('.xml')]
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.records.update(self.parse_efetch_xml(f.read()))
+        self.requests_made = 0
+
+    def fetch(self, pmids: List[str]) -> Dict[str, Dict[str, str]]:
+        ids = sorted(set(p.strip() for p in pmids if p and p.strip().isdigit()))
+        self.requests_made += (len(ids) + self.batch_size - 1) // self.batch_size
+        return {pmid: dict(self.records[pmid]) for pmid in ids if pmid in self.records}
+
+
+class SitemapReader:
+    """流式读取XML站点地图（支持 wp-sitemap.xml 等 sitemapindex 索引）"""
+
+    NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+    def __init__(self, timeout: float = 30.0, child_filter: str = 'publication'):
+        """
+        Args:
+            timeout: 请求超时（秒）
+            child_filter: 索引中只展开 loc 含该字符串的子站点地图（都不匹配时展开全部）
+        """
+        self.timeout = timeout
+        self.child_filter = child_filter
+        self.fetch_count = 0
+
+    def _open(self, url: str):
+        """打开站点地图（支持 http(s):// 和 file://，便于用本地样例测试）"""
+        self.fetch_count += 1
+        request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def iter_urls(self, sitemap_url: str, prefix: str = ''):
+        """
+        逐条产出 (url, lastmod)，索引文件会递归展开
+
+        Args:
+            sitemap_url: 站点地图或索引地址
+            prefix: 只产出以该前缀开头的URL
+        """
+        children = []
+        with self._open(sitemap_url) as response:
+            for _, elem in ET.iterparse(response):
+                tag = elem.tag.replace(self.NS, '')
+                if tag == 'url':
+                    loc = (elem.findtext(f'{self.NS}loc') or elem.findtext('loc') or '').strip()
+                    lastmod = (elem.findtext(f'{self.NS}lastmod') or elem.findtext('lastmod') or '').strip()
+                    if loc and loc.startswith(prefix):
+                        yield loc, lastmod
+                    elem.clear()
+                elif tag == 'sitemap':
+                    loc = (elem.findtext(f'{self.NS}loc') or elem.findtext('loc') or '').strip()
+                    if loc:
+                        children.append(loc)
+                    elem.clear()
+
+        if self.child_filter and any(self.child_filter in c for c in children):
+            children = [c for c in children if self.child_filter in c]
+        for child in children:
+            yield from self.iter_urls(child, prefix)
+
+
+class BrowserUnavailableError(Exception):
+    """无法创建或连接浏览器（与目标页面无关的本地故障）"""
+
+
+class TabPool:
+    """
+    单个Chrome进程内的多标签页池
+
+    每个工作线程租用一个标签页。WebDriver会话同一时刻只能执行一条命令，
+    因此切换窗口/发起导航/读取HTML在锁内完成，而页面加载等待在锁外进行，
+    多个标签页可同时处于加载中。标签页使用一定次数后回收重建；单个标签页
+    出错只替换该标签页，浏览器进程崩溃时整体重启；重启失败时池进入不可用状态，
+    等待中的线程抛出 BrowserUnavailableError，之后的调用会再尝试重启。
+    """
+
+    def __init__(self, driver_factory, tabs: int = 8, max_uses_per_tab: int = 50,
+                 load_timeout: float = 30.0, on_driver_closed=None, should_stop=lambda: False):
+        """
+        Args:
+            driver_factory: 创建WebDriver的函数（应使用 page_load_strategy='none'）
+            tabs: 标签页数量
+            max_uses_per_tab: 单个标签页最多加载多少个页面后回收
+            load_timeout: 等待页面加载完成的超时（秒）
+            on_driver_closed: 浏览器被关闭（重启或关闭池）时的回调，参数为旧 driver
+            should_stop: 返回是否应停止等待空闲标签页的函数
+        """
+        self.driver_factory = driver_factory
+        self.on_driver_closed = on_driver_closed
+        self.should_stop = should_stop
+        self.tabs = tabs
+        self.max_uses_per_tab = max_uses_per_tab
+        self.load_timeout = load_timeout
+        self.command_lock = threading.RLock()
+        self.free_tabs = queue.Queue()
+        self.uses = {}         # handle -> 已加载页面数
+        self.generation = 0    # 浏览器重启后递增，旧句柄作废
+        self.driver = None
+        self.closed = False
+        self.broken = None             # 重启失败的原因（不为 None 时池不可用）
+        self.state_cond = threading.Condition()
+        self.in_flight = 0             # 正在加载的标签页数
+        self.recycle_requested = False # 由监控线程请求整体回收浏览器
+
+    def start(self):
+        """启动浏览器并打开全部标签页"""
+        with self.command_lock:
+            driver = self.driver_factory()
+            if not driver:
+                raise BrowserUnavailableError("无法创建浏览器实例")
+            self.driver = driver
+            self.generation += 1
+            self.uses = {}
+            # 清空旧句柄（不替换队列对象，避免正在等待的线程挂在旧队列上）
+            while True:
+                try:
+                    self.free_tabs.get_nowait()
+                except queue.Empty:
+                    break
+            handles = [driver.current_window_handle]
+            self.uses[handles[0]] = 0
+            for _ in range(self.tabs - 1):
+                handles.append(self._open_tab())
+            for handle in handles:
+                self.free_tabs.put(handle)
+
+    def _open_tab(self) -> str:
+        """新开一个标签页（调用方需持有锁）"""
+        self.driver.switch_to.new_window('tab')
+        handle = self.driver.current_window_handle
+        # CDP注入脚本只作用于当前标签页，新标签页需要重新注入
+        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': HIDE_WEBDRIVER_SCRIPT})
+        self.uses[handle] = 0
+        return handle
+
+    def _replace_tab(self, handle: str):
+        """先开新标签页再关闭旧的，保证浏览器始终至少有一个窗口（调用方需持有锁）"""
+        new_handle = self._open_tab()
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except Exception:
+            pass
+        self.uses.pop(handle, None)
+        self.free_tabs.put(new_handle)
+
+    def _browser_alive(self) -> bool:
+        try:
+            with self.command_lock:
+                _ = self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _restart(self, generation: int, reason: str = '已崩溃'):
+        """浏览器进程异常时重启（同一代只重启一次）"""
+        with self.command_lock:
+            if generation != self.generation or self.closed:
+                return
+            print(f"⚠ 标签页浏览器{reason}，正在重启...")
+            self._quit_driver()
+            try:
+                self.start()
+            except Exception as e:
+                # 作废旧句柄并清空队列，等待中的线程看到 broken 后退出
+                self.generation += 1
+                while True:
+                    try:
+                        self.free_tabs.get_nowait()
+                    except queue.Empty:
+                        break
+                self.broken = str(e)
+                print(f"✗ 标签页浏览器重启失败: {e}")
+                raise BrowserUnavailableError(f"标签页浏览器重启失败: {e}") from e
+            self.broken = None
+
+    def request_recycle(self):
+        """
+        请求回收浏览器：等当前加载全部结束后再重启，不打断进行中的页面
+
+        没有进行中的加载时立即重启（工作线程可能都被内存租约挡住，不会再进入 render）。
+        """
+        with self.state_cond:
+            self.recycle_requested = True
+            self._restart_if_requested()
+
+    def _restart_if_requested(self):
+        """有回收请求且没有进行中的加载时重启浏览器（调用方需持有 state_cond）"""
+        if self.recycle_requested and self.in_flight == 0 and not self.closed:
+            self.recycle_requested = False
+            try:
+                self._restart(self.generation, reason='资源占用超限')
+            except BrowserUnavailableError:
+                pass  # 已标记为不可用，由下一次 render 重试
+
+    def render(self, url: str, wait_seconds: float = 2.0) -> str:
+        """在空闲标签页中加载URL并返回HTML"""
+        with self.state_cond:
+            while self.recycle_requested and self.in_flight > 0 and not self.closed and not self.should_stop():
+                self.state_cond.wait(1.0)
+            self._restart_if_requested()
+            self.in_flight += 1
+        try:
+            return self._render_in_tab(url, wait_seconds)
+        finally:
+            with self.state_cond:
+                self.in_flight -= 1
+                # 最后一个进行中的加载结束时执行挂起的回收
+                self._restart_if_requested()
+                self.state_cond.notify_all()
+
+    def _render_in_tab(self, url: str, wait_seconds: float) -> str:
+        if self.closed:
+            raise BrowserUnavailableError("标签页池已关闭")
+        if self.broken is not None:
+            # 上次重启失败，再尝试一次（失败时抛出 BrowserUnavailableError）
+            self._restart(self.generation, reason='不可用')
+        while True:
+            try:
+                handle = self.free_tabs.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if self.closed:
+                    raise BrowserUnavailableError("标签页池已关闭")
+                if self.broken is not None:
+                    raise BrowserUnavailableError(f"标签页浏览器不可用: {self.broken}")
+                if self.should_stop():
+                    raise BrowserUnavailableError("程序已停止")
+        generation = self.generation
+        try:
+            with self.command_lock:
+                self.driver.switch_to.window(handle)
+                self.driver.get(url)  # page_load_strategy='none'，立即返回
+
+            time.sleep(wait_seconds)
+            deadline = time.time() + self.load_timeout
+            while True:
+                with self.command_lock:
+                    self.driver.switch_to.window(handle)
+                    state = self.driver.execute_script('return document.readyState')
+                    if state == 'complete' or time.time() >= deadline:
+                        html = self.driver.page_source
+                        break
+                time.sleep(0.2)
+        except Exception as e:
+            if generation == self.generation:
+                if self._browser_alive():
+                    try:
+                        with self.command_lock:
+                            self._replace_tab(handle)
+                    except Exception:
+                        self._restart(generation)
+                else:
+                    self._restart(generation)
+            raise e
+
+        # 归还标签页（已达使用上限则回收重建）
+        with self.command_lock:
+            if generation != self.generation:
+                return html
+            self.uses[handle] = self.uses.get(handle, 0) + 1
+            if self.uses[handle] >= self.max_uses_per_tab:
+                try:
+                    self._replace_tab(handle)
+                except Exception:
+                    self.free_tabs.put(handle)
+            else:
+                self.free_tabs.put(handle)
+        return html
+
+    def _quit_driver(self):
+        """关闭当前浏览器（调用方需持有锁）"""
+        if not self.driver:
+            return
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        if self.on_driver_closed:
+            self.on_driver_closed(self.driver)
+        self.driver = None
+
+    def close(self):
+        """关闭浏览器"""
+        self.closed = True
+        with self.command_lock:
+            self._quit_driver()
+
+
+class ChallengeDetectedError(Exception):
+    """HTTP请求遇到反爬验证页，且重新获取会话后仍未通过"""
+
+
+class HttpSessionPool:
+    """
+    浏览器预热 + 轻量HTTP请求
+
+    由一个浏览器会话通过反爬验证并预热，导出 cookies、User-Agent 和请求头，
+    之后所有工作线程直接用 urllib 发请求。检测到验证页或 403/429/503 时，
+    只由一个线程回到浏览器重新获取会话，其余线程复用新的会话重试。
+    """
+
+    CHALLENGE_STATUS = {403, 429, 503}
+    CHALLENGE_MARKERS = ('challenge-platform', 'cf-challenge', 'cf_chl_', '<title>just a moment',
+                         'attention required', 'g-recaptcha', 'h-captcha')
+
+    def __init__(self, driver_factory, warmup_url: str, timeout: float = 30.0,
+                 warmup_wait: float = 5.0, on_driver_closed=None):
+        """
+        Args:
+            driver_factory: 创建预热浏览器的函数
+            warmup_url: 预热页面地址
+            timeout: HTTP请求超时（秒）
+            warmup_wait: 预热页面加载后的等待时间（秒）
+            on_driver_closed: 预热浏览器关闭时的回调
+        """
+        self.driver_factory = driver_factory
+        self.warmup_url = warmup_url
+        self.timeout = timeout
+        self.warmup_wait = warmup_wait
+        self.on_driver_closed = on_driver_closed
+        self.lock = threading.Lock()
+        self.driver = None
+        self.generation = 0
+        self.headers = {}
+        self.cookie_jar = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookie_jar))
+        self.harvest_count = 0
+        self.request_count = 0
+
+    @classmethod
+    def is_challenge(cls, status: int, body: str) -> bool:
+        """判断响应是否为反爬验证页"""
+        if status in cls.CHALLENGE_STATUS:
+            return True
+        head = body[:20000].lower()
+        return any(marker in head for marker in cls.CHALLENGE_MARKERS)
+
+    @staticmethod
+    def _to_cookie(c: Dict) -> http.cookiejar.Cookie:
+        """把Selenium导出的cookie转为cookiejar格式"""
+        domain = c.get('domain', '')
+        return http.cookiejar.Cookie(
+            version=0, name=c['name'], value=c['value'], port=None, port_specified=False,
+            domain=domain, domain_specified=bool(domain), domain_initial_dot=domain.startswith('.'),
+            path=c.get('path', '/'), path_specified=True, secure=c.get('secure', False),
+            expires=c.get('expiry'), discard=False, comment=None, comment_url=None,
+            rest={'HttpOnly': None} if c.get('httpOnly') else {}, rfc2109=False
+        )
+
+    def harvest(self):
+        """用浏览器通过验证并导出会话（调用方需持有锁）"""
+        if not self.driver:
+            self.driver = self.driver_factory()
+            if not self.driver:
+                raise BrowserUnavailableError("无法创建预热浏览器")
+        print(f"正在用浏览器预热会话: {self.warmup_url}")
+        self.driver.get(self.warmup_url)
+        time.sleep(self.warmup_wait)
+        # 验证页通常会自动跳转，最多再等30秒
+        deadline = time.time() + 30
+        while self.is_challenge(200, self.driver.page_source) and time.time() < deadline:
+            time.sleep(2)
+
+        user_agent = self.driver.execute_script('return navigator.userAgent')
+        languages = self.driver.execute_script('return (navigator.languages || []).join(",")') or 'en-US,en'
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': languages,
+            'Accept-Encoding': 'gzip',
+            'Referer': self.warmup_url,
+        }
+        self.cookie_jar.clear()
+        for cookie in self.driver.get_cookies():
+            self.cookie_jar.set_cookie(self._to_cookie(cookie))
+        self.generation += 1
+        self.harvest_count += 1
+        print(f"✓ 会话预热完成（第 {self.harvest_count} 次，cookies: {len(self.cookie_jar)} 个）")
+
+    def _ensure_session(self) -> int:
+        with self.lock:
+            if self.generation == 0:
+                self.harvest()
+            return self.generation
+
+    def _reharvest(self, generation: int):
+        """会话失效时重新获取（同一代只由一个线程执行）"""
+        with self.lock:
+            if generation == self.generation:
+                self.harvest()
+
+    def _request(self, url: str):
+        """发出一次GET请求，返回 (状态码, 文本)"""
+        request = urllib.request.Request(url, headers=self.headers)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, raw, encoding = response.status, response.read(), response.headers.get('Content-Encoding')
+        except urllib.error.HTTPError as e:
+            status, raw, encoding = e.code, e.read(), e.headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            raw = gzip.decompress(raw)
+        return status, raw.decode('utf-8', errors='replace')
+
+    def fetch(self, url: str, max_reharvests: int = 1) -> str:
+        """获取页面HTML，遇到验证页时重新预热后重试"""
+        for attempt in range(max_reharvests + 1):
+            generation = self._ensure_session()
+            status, body = self._request(url)
+            self.request_count += 1
+            if not self.is_challenge(status, body):
+                if status >= 400:
+                    raise Exception(f"HTTP {status}: {url}")
+                return body
+            if attempt < max_reharvests:
+                print(f"⚠ HTTP请求遇到验证（状态码 {status}），重新从浏览器获取会话")
+                self._reharvest(generation)
+        raise ChallengeDetectedError(f"重新预热后仍被拦截（状态码 {status}）: {url}")
+
+    def release_driver(self) -> bool:
+        """
+        关闭预热浏览器（资源回收用），已导出的会话继续使用，需要重新预热时再创建
+
+        Returns:
+            是否已关闭（正在预热时跳过，等下一次采样）
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            if self.driver:
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+                if self.on_driver_closed:
+                    self.on_driver_closed(self.driver)
+                self.driver = None
+            return True
+        finally:
+            self.lock.release()
+
+    def close(self):
+        with self.lock:
+            if self.driver:
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+                if self.on_driver_closed:
+                    self.on_driver_closed(self.driver)
+                self.driver = None
+
+
+class CDPBrowser:
+    """
+    直接通过 DevTools 协议（WebSocket）驱动无头 Chrome 的异步后端
+
+    一个 Chrome 进程、一条 WebSocket 连接，每个页面是一个独立 target
+    （flatten 会话），由同一个事件循环并发驱动。支持导航、等待 load 事件、
+    读取HTML，并通过 Fetch 域拦截图片/字体/媒体等无关资源。
+    需要安装 websockets：pip install websockets
+    """
+
+    CHROME_CANDIDATES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+                         r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+                         r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+                         '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome']
+    BLOCKED_RESOURCE_TYPES = ('Image', 'Media', 'Font', 'Stylesheet')
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+    def __init__(self, chrome_path: str = None, headless: bool = True, command_timeout: float = 30.0,
+                 blocked_resource_types=BLOCKED_RESOURCE_TYPES):
+        """
+        Args:
+            chrome_path: Chrome可执行文件路径（默认自动查找）
+            headless: 是否无头模式
+            command_timeout: 单条CDP命令的超时（秒）
+            blocked_resource_types: 需要拦截的资源类型（空则不拦截）
+        """
+        self.chrome_path = chrome_path
+        self.headless = headless
+        self.command_timeout = command_timeout
+        self.blocked_resource_types = tuple(blocked_resource_types or ())
+        self.process = None
+        self.user_data_dir = None
+        self.ws = None
+        self._reader = None
+        self._next_id = 0
+        self._pending = {}    # 命令id -> Future
+        self._listeners = {}  # sessionId -> 事件回调
+        self._tasks = set()   # Fetch 拦截的响应任务
+
+    def _find_chrome(self) -> str:
+        for candidate in ([self.chrome_path] if self.chrome_path else self.CHROME_CANDIDATES):
+            path = shutil.which(candidate) or (candidate if os.path.exists(candidate) else None)
+            if path:
+                return path
+        raise BrowserUnavailableError("未找到Chrome可执行文件，请通过 chrome_path 指定")
+
+    async def start(self):
+        """启动Chrome并连接浏览器级 WebSocket"""
+        self.user_data_dir = tempfile.mkdtemp(prefix='ukb_cdp_')
+        args = [self._find_chrome(), '--remote-debugging-port=0', f'--user-data-dir={self.user_data_dir}',
+                '--no-first-run', '--no-default-browser-check', '--no-sandbox', '--disable-gpu',
+                '--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled',
+                '--window-size=1920,1080', f'--user-agent={self.USER_AGENT}', 'about:blank']
+        if self.headless:
+            args.insert(1, '--headless=new')
+        self.process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+
+        # Chrome 启动后把端口和浏览器 WebSocket 路径写入 DevToolsActivePort
+        port_file = os.path.join(self.user_data_dir, 'DevToolsActivePort')
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            if os.path.exists(port_file):
+                with open(port_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    await self.connect(f'ws://127.0.0.1:{lines[0]}{lines[1]}')
+                    return
+            if self.process.returncode is not None:
+                break
+            await asyncio.sleep(0.1)
+        await self.close()
+        raise BrowserUnavailableError("Chrome 启动失败或未开放调试端口")
+
+    async def connect(self, ws_url: str):
+        """连接到已运行浏览器的 WebSocket 地址"""
+        try:
+            import websockets
+        except ImportError:
+            raise BrowserUnavailableError("CDP后端需要 websockets：pip install websockets")
+        self.ws = await websockets.connect(ws_url, max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        """分发命令结果与事件"""
+        try:
+            async for message in self.ws:
+                data = json.loads(message)
+                if 'id' in data:
+                    future = self._pending.pop(data['id'], None)
+                    if future and not future.done():
+                        if 'error' in data:
+                            future.set_exception(Exception(f"CDP错误: {data['error'].get('message')}"))
+                        else:
+                            future.set_result(data.get('result', {}))
+                else:
+                    listener = self._listeners.get(data.get('sessionId'))
+                    if listener:
+                        listener(data.get('method'), data.get('params', {}))
+        except Exception:
+            pass
+        finally:
+            # 连接断开（浏览器崩溃或关闭），让所有等待中的命令失败
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(BrowserUnavailableError("与Chrome的连接已断开"))
+            self._pending.clear()
+
+    async def send(self, method: str, params: Dict = None, session_id: str = None) -> Dict:
+        """发送一条CDP命令并等待结果"""
+        if not self.ws or (self._reader and self._reader.done()):
+            raise BrowserUnavailableError("与Chrome的连接已断开")
+        self._next_id += 1
+        message = {'id': self._next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self.ws.send(json.dumps(message))
+        return await asyncio.wait_for(future, self.command_timeout)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def fetch_html(self, url: str, wait_seconds: float = 2.0, load_timeout: float = 30.0) -> str:
+        """新建页面、导航并等待 load 事件，返回渲染后的HTML；页面用完即关闭"""
+        target_id = (await self.send('Target.createTarget', {'url': 'about:blank'}))['targetId']
+        session_id = None
+        loaded = asyncio.Event()
+        crashed = []
+
+        def on_event(method, params):
+            if method == 'Page.loadEventFired':
+                loaded.set()
+            elif method == 'Inspector.targetCrashed':
+                crashed.append(True)
+                loaded.set()
+            elif method == 'Fetch.requestPaused':
+                if params.get('resourceType') in self.blocked_resource_types:
+                    self._spawn(self.send('Fetch.failRequest', {'requestId': params['requestId'],
+                                                                 'errorReason': 'BlockedByClient'}, session_id))
+                else:
+                    self._spawn(self.send('Fetch.continueRequest', {'requestId': params['requestId']}, session_id))
+
+        try:
+            session_id = (await self.send('Target.attachToTarget',
+                                          {'targetId': target_id, 'flatten': True}))['sessionId']
+            self._listeners[session_id] = on_event
+            await self.send('Page.enable', session_id=session_id)
+            await self.send('Inspector.enable', session_id=session_id)
+            await self.send('Page.addScriptToEvaluateOnNewDocument', {'source': HIDE_WEBDRIVER_SCRIPT}, session_id)
+            if self.blocked_resource_types:
+                await self.send('Fetch.enable', {'patterns': [{'urlPattern': '*', 'requestStage': 'Request'}]},
+                                session_id)
+
+            navigation = await self.send('Page.navigate', {'url': url}, session_id)
+            if navigation.get('errorText'):
+                raise Exception(f"导航失败: {navigation['errorText']}")
+            await asyncio.wait_for(loaded.wait(), load_timeout)
+            if crashed:
+                raise Exception("页面渲染进程崩溃")
+            await asyncio.sleep(wait_seconds)
+
+            result = await self.send('Runtime.evaluate', {'expression': 'document.documentElement.outerHTML',
+                                                          'returnByValue': True}, session_id)
+            return result.get('result', {}).get('value', '')
+        finally:
+            self._listeners.pop(session_id, None)
+            try:
+                await self.send('Target.closeTarget', {'targetId': target_id})
+            except Exception:
+                pass
+
+    async def close(self):
+        """关闭连接、结束Chrome进程并清理临时目录"""
+        if self.ws:
+            try:
+                await self.send('Browser.close')
+            except Exception:
+                pass
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+        if self._reader:
+            self._reader.cancel()
+        if self.process and self.process.returncode is None:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), 5)
+            except Exception:
+                try:
+                    self.process.kill()
+                except Exception:
+                    pass
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+
+class BrowserSupervisor:
+    """
+    浏览器资源监控线程
+
+    只跟踪本程序启动的浏览器进程树（chromedriver 及其子进程），定期采样
+    RSS 和 CPU，超过阈值的浏览器交由回调回收；所有浏览器总内存超限时，
+    acquire_lease() 会阻塞新的页面加载，直到内存回落。
+    """
+
+    def __init__(self, max_driver_rss_mb: float = 1500, max_total_rss_mb: float = 6000,
+                 max_driver_cpu_percent: float = None, cpu_strikes: int = 3,
+                 interval: float = 5.0, on_recycle=None):
+        """
+        Args:
+            max_driver_rss_mb: 单个浏览器进程树的内存上限（MB），超过则回收
+            max_total_rss_mb: 全部浏览器的内存上限（MB），超过则暂停新租约
+            max_driver_cpu_percent: 单个浏览器的CPU上限（%），连续 cpu_strikes 次超过则回收；None 表示不限制
+            cpu_strikes: CPU连续超限次数
+            interval: 采样间隔（秒）
+            on_recycle: 回收回调，参数为需要回收的 driver
+        """
+        self.max_driver_rss_mb = max_driver_rss_mb
+        self.max_total_rss_mb = max_total_rss_mb
+        self.max_driver_cpu_percent = max_driver_cpu_percent
+        self.cpu_strikes = cpu_strikes
+        self.interval = interval
+        self.on_recycle = on_recycle
+        self.lock = threading.Lock()
+        self.drivers = {}       # id(driver) -> {'driver', 'pid', 'strikes'}
+        self.processes = {}     # pid -> psutil.Process（保留对象以计算CPU占用）
+        self.total_rss_mb = 0.0
+        self.last_sample = {}   # id(driver) -> {'rss_mb', 'cpu_percent', 'processes'}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='browser-supervisor', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    @staticmethod
+    def _driver_pid(driver):
+        """chromedriver 服务进程的PID（浏览器进程是它的子进程）"""
+        try:
+            return driver.service.process.pid
+        except Exception:
+            return None
+
+    def register(self, driver):
+        pid = self._driver_pid(driver)
+        if pid:
+            with self.lock:
+                self.drivers[id(driver)] = {'driver': driver, 'pid': pid, 'strikes': 0}
+
+    def unregister(self, driver):
+        with self.lock:
+            self.drivers.pop(id(driver), None)
+            self.last_sample.pop(id(driver), None)
+
+    def _process_tree(self, pid: int) -> List:
+        try:
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return []
+
+    def sample(self) -> Dict:
+        """采样所有已登记浏览器的进程树，返回需要回收的 driver 列表及总内存"""
+        with self.lock:
+            entries = list(self.drivers.items())
+        to_recycle = []
+        total_rss = 0.0
+        seen_pids = set()
+        for key, entry in entries:
+            rss = 0.0
+            cpu = 0.0
+            procs = self._process_tree(entry['pid'])
+            for proc in procs:
+                cached = self.processes.setdefault(proc.pid, proc)
+                seen_pids.add(proc.pid)
+                try:
+                    rss += cached.memory_info().rss / (1024 * 1024)
+                    cpu += cached.cpu_percent(interval=None)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            total_rss += rss
+            with self.lock:
+                if key not in self.drivers:
+                    continue
+                self.last_sample[key] = {'rss_mb': rss, 'cpu_percent': cpu, 'processes': len(procs)}
+                if self.max_driver_cpu_percent and cpu > self.max_driver_cpu_percent:
+                    entry['strikes'] += 1
+                else:
+                    entry['strikes'] = 0
+                if (self.max_driver_rss_mb and rss > self.max_driver_rss_mb) or \
+                        entry['strikes'] >= self.cpu_strikes:
+                    to_recycle.append(entry['driver'])
+                    entry['strikes'] = 0
+        # 清理已退出进程的缓存
+        for pid in list(self.processes):
+            if pid not in seen_pids:
+                self.processes.pop(pid, None)
+        self.total_rss_mb = total_rss
+        return {'to_recycle': to_recycle, 'total_rss_mb': total_rss}
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                result = self.sample()
+                for driver in result['to_recycle']:
+                    print(f"⚠ 浏览器资源占用超限，回收中: {self.last_sample.get(id(driver), {})}")
+                    if self.on_recycle:
+                        self.on_recycle(driver)
+            except Exception as e:
+                print(f"浏览器监控采样失败: {e}")
+
+    def acquire_lease(self, should_stop=lambda: False) -> bool:
+        """
+        总内存超限时阻塞新的页面加载
+
+        Returns:
+            是否允许继续
+        """
+        while not should_stop():
+            with self.lock:
+                active = len(self.drivers)
+            if not self.max_total_rss_mb or active == 0 or self.total_rss_mb <= self.max_total_rss_mb:
+                return True
+            time.sleep(min(self.interval, 1.0))
+        return False
+
+    @staticmethod
+    def kill_own_browsers():
+        """只终止本进程派生的 chrome/chromedriver 进程，不影响机器上的其他任务"""
+        try:
+            children = psutil.Process(os.getpid()).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        targets = []
+        for proc in children:
+            try:
+                if 'chrome' in proc.name().lower():
+                    proc.terminate()
+                    targets.append(proc)
+                    print("Terminated Chrome process:", proc.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(targets, timeout=3)
+        for proc in alive:
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+
+class PublicationIndex:
+    """
+    基于 SQLite FTS5 的出版物全文索引
+
+    对标题、摘要、作者、期刊、疾病领域建全文索引（BM25排序），并支持按
+    疾病领域、期刊和发布日期筛选。写入CSV时同步增量更新。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS publications (
+            id INTEGER PRIMARY KEY,
+            link TEXT UNIQUE NOT NULL,
+            title TEXT, abstract TEXT, authors TEXT, journal TEXT COLLATE NOCASE,
+            disease_areas TEXT, publish_date TEXT, publish_date_iso TEXT,
+            pubmed_id TEXT, doi TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_publications_journal ON publications(journal);
+        CREATE INDEX IF NOT EXISTS idx_publications_date ON publications(publish_date_iso);
+        CREATE TABLE IF NOT EXISTS publication_disease_areas (
+            pub_id INTEGER NOT NULL,
+            area TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (pub_id, area)
+        );
+        CREATE INDEX IF NOT EXISTS idx_disease_areas_area ON publication_disease_areas(area);
+        CREATE VIRTUAL TABLE IF NOT EXISTS publications_fts USING fts5(
+            title, abstract, authors, journal, disease_areas,
+            content='publications', content_rowid='id', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS publications_ai AFTER INSERT ON publications BEGIN
+            INSERT INTO publications_fts(rowid, title, abstract, authors, journal, disease_areas)
+            VALUES (new.id, new.title, new.abstract, new.authors, new.journal, new.disease_areas);
+        END;
+        CREATE TRIGGER IF NOT EXISTS publications_ad AFTER DELETE ON publications BEGIN
+            INSERT INTO publications_fts(publications_fts, rowid, title, abstract, authors, journal, disease_areas)
+            VALUES ('delete', old.id, old.title, old.abstract, old.authors, old.journal, old.disease_areas);
+        END;
+        CREATE TRIGGER IF NOT EXISTS publications_au AFTER UPDATE ON publications BEGIN
+            INSERT INTO publications_fts(publications_fts, rowid, title, abstract, authors, journal, disease_areas)
+            VALUES ('delete', old.id, old.title, old.abstract, old.authors, old.journal, old.disease_areas);
+            INSERT INTO publications_fts(rowid, title, abstract, authors, journal, disease_areas)
+            VALUES (new.id, new.title, new.abstract, new.authors, new.journal, new.disease_areas);
+        END;
+    """
+
+    DATE_FORMATS = ['%d %B %Y', '%d %b %Y', '%B %Y', '%b %Y', '%Y-%m-%d', '%Y']
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def _iso_date(cls, text: str) -> str:
+        """把 '17 July 2023' 等格式转为 ISO 日期，便于范围筛选"""
+        text = ' '.join((text or '').split())
+        for fmt in cls.DATE_FORMATS:
+            try:
+                return datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return ''
+
+    def upsert(self, publications):
+        """增量写入/更新记录（FTS表由触发器同步）"""
+        with self.lock, self.conn:
+            for pub in publications:
+                if not pub.link:
+                    continue
+                self.conn.execute(
+                    """INSERT INTO publications (link, title, abstract, authors, journal, disease_areas,
+                                                 publish_date, publish_date_iso, pubmed_id, doi)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(link) DO UPDATE SET
+                           title=excluded.title, abstract=excluded.abstract, authors=excluded.authors,
+                           journal=excluded.journal, disease_areas=excluded.disease_areas,
+                           publish_date=excluded.publish_date, publish_date_iso=excluded.publish_date_iso,
+                           pubmed_id=excluded.pubmed_id, doi=excluded.doi""",
+                    (pub.link, pub.title, '' if pub.abstract == '未找到摘要' else pub.abstract,
+                     pub.authors, pub.journal, '; '.join(pub.disease_areas), pub.publish_date,
+                     self._iso_date(pub.publish_date), pub.pubmed_id, pub.doi)
+                )
+                pub_id = self.conn.execute('SELECT id FROM publications WHERE link = ?', (pub.link,)).fetchone()[0]
+                self.conn.execute('DELETE FROM publication_disease_areas WHERE pub_id = ?', (pub_id,))
+                self.conn.executemany(
+                    'INSERT OR IGNORE INTO publication_disease_areas (pub_id, area) VALUES (?, ?)',
+                    [(pub_id, area) for area in pub.disease_areas]
+                )
+
+    def delete(self, links):
+        """按链接删除记录（FTS表由触发器同步）"""
+        with self.lock, self.conn:
+            for link in links:
+                self.conn.execute('DELETE FROM publication_disease_areas WHERE pub_id IN '
+                                  '(SELECT id FROM publications WHERE link = ?)', (link,))
+                self.conn.execute('DELETE FROM publications WHERE link = ?', (link,))
+
+    def count(self) -> int:
+        """索引中的记录数"""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM publications').fetchone()[0]
+
+    def rebuild_from_csv(self, csv_filename: str) -> int:
+        """从CSV全量重建索引，返回记录数"""
+        publications = load_publications_csv(csv_filename)
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM publication_disease_areas')
+            self.conn.execute('DELETE FROM publications')
+            self.conn.execute("INSERT INTO publications_fts(publications_fts) VALUES ('rebuild')")
+        self.upsert(publications)
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO publications_fts(publications_fts) VALUES ('optimize')")
+        return len(publications)
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """把普通关键词转为FTS5表达式（每个词加引号，词之间为AND）"""
+        terms = [t for t in query.split() if t]
+        return ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+
+    def _filters(self, disease_area=None, journal=None, date_from=None, date_to=None):
+        """构造筛选条件"""
+        clauses, params = [], []
+        if disease_area:
+            clauses.append('p.id IN (SELECT pub_id FROM publication_disease_areas WHERE area = ?)')
+            params.append(disease_area)
+        if journal:
+            clauses.append('p.journal = ?')
+            params.append(journal)
+        if date_from:
+            clauses.append('p.publish_date_iso >= ?')
+            params.append(date_from if len(date_from) > 4 else f'{date_from}-01-01')
+        if date_to:
+            clauses.append("p.publish_date_iso <= ? AND p.publish_date_iso != ''")
+            params.append(date_to if len(date_to) > 4 else f'{date_to}-12-31')
+        return clauses, params
+
+    def search(self, query: str = '', disease_area: str = None, journal: str = None,
+               date_from: str = None, date_to: str = None, limit: int = 20, raw: bool = False) -> List[Dict]:
+        """
+        排序检索
+
+        Args:
+            query: 关键词（raw=True 时按FTS5语法解释）；为空时只按筛选条件返回最新文章
+            disease_area: 疾病领域（精确匹配，不区分大小写）
+            journal: 期刊（精确匹配，不区分大小写）
+            date_from: 发布日期下限，'YYYY' 或 'YYYY-MM-DD'
+            date_to: 发布日期上限，'YYYY' 或 'YYYY-MM-DD'
+            limit: 最多返回条数
+
+        Returns:
+            结果字典列表（含 score 和摘要片段 snippet）
+        """
+        clauses, params = self._filters(disease_area, journal, date_from, date_to)
+        if query.strip():
+            sql = """SELECT p.link, p.title, p.authors, p.journal, p.disease_areas, p.publish_date, p.pubmed_id, p.doi,
+                            bm25(publications_fts, 10.0, 1.0, 2.0, 2.0, 3.0) AS score,
+                            snippet(publications_fts, 1, '[', ']', '...', 16) AS snippet
+                     FROM publications_fts JOIN publications p ON p.id = publications_fts.rowid
+                     WHERE publications_fts MATCH ?"""
+            params = [query if raw else self._match_expression(query)] + params
+            order = 'score'
+        else:
+            sql = """SELECT p.link, p.title, p.authors, p.journal, p.disease_areas, p.publish_date, p.pubmed_id, p.doi,
+                            0.0 AS score, substr(p.abstract, 1, 160) AS snippet
+                     FROM publications p WHERE 1 = 1"""
+            order = 'p.publish_date_iso DESC'
+        for clause in clauses:
+            sql += f' AND {clause}'
+        sql += f' ORDER BY {order} LIMIT ?'
+        params.append(limit)
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def facets(self, query: str = '', limit: int = 10, raw: bool = False, **filters) -> Dict[str, List]:
+        """统计检索结果中疾病领域、期刊、年份的分布"""
+        clauses, params = self._filters(**filters)
+        base = 'SELECT p.id FROM publications p'
+        if query.strip():
+            base = 'SELECT p.id FROM publications_fts JOIN publications p ON p.id = publications_fts.rowid ' \
+                   'WHERE publications_fts MATCH ?'
+            params = [query if raw else self._match_expression(query)] + params
+        else:
+            base += ' WHERE 1 = 1'
+        for clause in clauses:
+            base += f' AND {clause}'
+        result = {}
+        queries = {
+            'disease_areas': f'SELECT area AS value, COUNT(*) AS n FROM publication_disease_areas '
+                             f'WHERE pub_id IN ({base}) GROUP BY area ORDER BY n DESC LIMIT ?',
+            'journal': f"SELECT journal AS value, COUNT(*) AS n FROM publications WHERE id IN ({base}) "
+                       f"AND journal != '' GROUP BY journal ORDER BY n DESC LIMIT ?",
+            'year': f"SELECT substr(publish_date_iso, 1, 4) AS value, COUNT(*) AS n FROM publications "
+                    f"WHERE id IN ({base}) AND publish_date_iso != '' GROUP BY value ORDER BY value DESC LIMIT ?"
+        }
+        with self.lock:
+            for name, sql in queries.items():
+                result[name] = [(row['value'], row['n']) for row in self.conn.execute(sql, params + [limit])]
+        return result
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class StatusReporter:
+    """
+    抓取状态汇报：按滚动窗口统计吞吐量、失败率和预计剩余时间
+
+    默认在终端上刷新同一行（非终端输出时按 log_interval 打印一行）；设置
+    status_filename 后改为定期向该文件追加 JSON 行，便于外部监控。
+    逐条任务只更新计数，实际输出按 interval 限频，由后台线程定期刷新。
+    """
+
+    PHASE_NAMES = {'listing': '列表页', 'detail': '详情', 'recheck': '重新检查'}
+
+    def __init__(self, status_filename: str = None, interval: float = 2.0, log_interval: float = 30.0,
+                 window: float = 60.0, driver_count=None, stream=None):
+        """
+        Args:
+            status_filename: JSON行状态文件（None 时输出到终端）
+            interval: 刷新间隔（秒）
+            log_interval: 非终端输出时的打印间隔（秒）
+            window: 吞吐量与失败率的滚动窗口（秒）
+            driver_count: 返回当前活跃浏览器数量的回调
+            stream: 输出流，默认 sys.stdout
+        """
+        self.status_filename = status_filename
+        self.interval = interval
+        self.log_interval = log_interval
+        self.window = window
+        self.driver_count = driver_count
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+        self.phase = None
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.phase_start = 0.0
+        self.events = deque()  # (完成时间, 是否成功)，只保留窗口内的记录
+        self._last_render = 0.0
+        self._line_width = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def begin_phase(self, phase: str, total: int):
+        """开始一个阶段（重置计数并启动定期刷新）"""
+        self.end_phase()
+        with self.lock:
+            self.phase = phase
+            self.total = total
+            self.done = self.failed = self.in_flight = 0
+            self.phase_start = time.time()
+            self.events.clear()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='status-reporter', daemon=True)
+        self._thread.start()
+
+    def end_phase(self):
+        """结束当前阶段，输出最终状态"""
+        if not self._thread:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.render(final=True)
+        with self.lock:
+            self.phase = None
+
+    def task_started(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def task_finished(self, success: bool):
+        now = time.time()
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.done += 1
+            if not success:
+                self.failed += 1
+            self.events.append((now, success))
+
+    def add_total(self, count: int):
+        """阶段进行中追加任务数（如重新抓取的页面）"""
+        with self.lock:
+            self.total += count
+
+    def log(self, message: str):
+        """输出一条消息而不打乱状态行"""
+        with self.lock:
+            if self._line_width and not self.status_filename:
+                self.stream.write('\r' + ' ' * self._line_width + '\r')
+                self._line_width = 0
+            print(message, file=self.stream, flush=True)
+
+    def snapshot(self) -> Dict[str, any]:
+        """当前阶段的状态"""
+        now = time.time()
+        with self.lock:
+            while self.events and self.events[0][0] < now - self.window:
+                self.events.popleft()
+            span = min(self.window, max(now - self.phase_start, 1e-6))
+            recent = len(self.events)
+            recent_failed = len([e for e in self.events if not e[1]])
+            rate = recent / span
+            remaining = max(self.total - self.done, 0)
+            status = {
+                'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'phase': self.phase,
+                'done': self.done,
+                'total': self.total,
+                'failed': self.failed,
+                'in_flight': self.in_flight,
+                'rate_per_min': round(rate * 60, 2),
+                'failure_rate': round(recent_failed / recent, 3) if recent else 0.0,
+                'eta_seconds': round(remaining / rate) if rate > 0 else None,
+                'elapsed_seconds': round(now - self.phase_start, 1)
+            }
+        try:
+            status['active_drivers'] = self.driver_count() if self.driver_count else None
+        except Exception:
+            status['active_drivers'] = None
+        return status
+
+    @staticmethod
+    def _format_seconds(seconds) -> str:
+        if seconds is None:
+            return '--:--'
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes:02d}:{seconds:02d}'
+
+    @staticmethod
+    def _display_width(text: str) -> int:
+        """终端显示宽度（中文等全角字符占两列）"""
+        return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+    def format_line(self, status: Dict[str, any]) -> str:
+        phase = self.PHASE_NAMES.get(status['phase'], status['phase'])
+        line = (f"[{phase}] {status['done']}/{status['total']} | {status['rate_per_min']:.1f}/分钟 | "
+                f"剩余 {self._format_seconds(status['eta_seconds'])} | 进行中 {status['in_flight']} | "
+                f"失败 {status['failed']}（近期 {status['failure_rate']:.0%}）")
+        if status.get('active_drivers') is not None:
+            line += f" | 浏览器 {status['active_drivers']}"
+        return line
+
+    def render(self, final: bool = False):
+        """按当前模式输出一次状态"""
+        if not self.phase:
+            return
+        status = self.snapshot()
+        now = time.time()
+        with self.lock:
+            if self.status_filename:
+                status['final'] = final
+                try:
+                    with open(self.status_filename, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(status, ensure_ascii=False) + '\n')
+                except Exception as e:
+                    print(f"写入状态文件失败: {e}")
+            elif self.stream.isatty():
+                line = self.format_line(status)
+                width = self._display_width(line)
+                self.stream.write('\r' + line + ' ' * max(self._line_width - width, 0) + ('\n' if final else ''))
+                self.stream.flush()
+                self._line_width = 0 if final else width
+            elif final or now - self._last_render >= self.log_interval:
+                print(self.format_line(status), file=self.stream, flush=True)
+            else:
+                return
+            self._last_render = now
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.render()
+
+
 class UKBiobankScraperSelenium:
     """UK Biobank出版物爬虫类 - 使用Selenium"""
     
-    def __init__(self, base_url="https://www.ukbiobank.ac.uk/discoveries-and-impact/publications/", headless=False):
+    PAGE_SIZE = 10  # 列表页每页文章数
+    
+    def __init__(self, base_url="https://www.ukbiobank.ac.uk/discoveries-and-impact/publications/", headless=False,
+                 browser_mode='process', tabs_per_browser=8):
+        """
+        Args:
+            base_url: 出版物列表页地址
+            headless: 是否无头模式
+            browser_mode: 'process' 每个任务独立Chrome进程；'tabs' 所有任务共享一个Chrome进程的多个标签页；
+                'http' 一个浏览器预热会话，之后用轻量HTTP请求获取页面；
+                'cdp' 单个事件循环通过DevTools协议直接驱动Chrome（需要 websockets）
+            tabs_per_browser: 'tabs'/'cdp' 模式下的并发页面数（这两种模式下取代 max_workers）
+        """
         self.base_url = base_url
         self.headless = headless
+        self.browser_mode = browser_mode
+        self.tabs_per_browser = tabs_per_browser
+        self.tab_pool = None  # 'tabs' 模式下的标签页池（惰性创建）
+        self.http_pool = None  # 'http' 模式下的会话池（惰性创建）
+        self.chrome_path = None  # 'cdp' 模式的Chrome路径（默认自动查找）
         self.driver = None
         self.file_lock = threading.Lock()  # 文件写入锁
+        self._csv_cache = None  # upsert_many_to_csv 的CSV解析缓存
         self.total_saved = 0  # 已保存文章计数
         self.progress_lock = threading.Lock()  # 进度追踪锁
         self.pages_completed = 0  # 已完成页数
         self.articles_completed = 0  # 已完成文章数
         self.should_stop = False  # 停止标志
         self.active_drivers = []  # 活跃的浏览器实例列表
-        self._init_driver()
+        self.retry_tracker = None  # 详情获取重试状态（按CSV文件惰性创建）
+        self.scheduler = None  # 任务优先级调度（按CSV文件惰性创建）
+        self.fingerprints = None  # 详情页内容指纹（按CSV文件惰性创建）
+        self.deadline = None  # 本次运行的截止时间戳（time_budget，None 表示不限）
+        self.result_total = None  # 最近一次检测到的结果总数
+        self.circuit_breaker = CircuitBreaker()  # 全局熔断器
+        self.pubmed_client = PubMedClient()  # PubMed元数据补全（设为None可关闭）
+        self.search_index = None  # 全文索引（PublicationIndex，写CSV时同步更新）
+        self.record_sink = None  # 详情完成后的记录回调（供 iter_publications 使用）
+        self.last_result = None  # iter_publications 最近一次完整运行的统计信息
+        self.supervisor = BrowserSupervisor(on_recycle=self._recycle_driver)  # 浏览器资源监控
+        self.supervisor.start()
+        self.cdp_browsers = 0  # 'cdp' 模式下运行中的Chrome数量（不经过 WebDriver，未登记到资源监控）
+        self.status = StatusReporter(driver_count=lambda: len(self.supervisor.drivers) + self.cdp_browsers)  # 吞吐量/ETA状态输出
+        if browser_mode == 'process':
+            # 其余模式的零散页面（如检测总页数）都走 _render_page，不再额外常驻一个 Chrome：
+            # 'cdp' 由 CDPBrowser 渲染，'tabs' 使用标签页池，'http' 复用预热会话
+            self._init_driver()
         self._setup_signal_handlers()
         # 查询条件与起始时间（用于进度文件）
         self.filter_query = {
@@ -73,8 +2026,20 @@ class UKBiobankScraperSelenium:
     
     def _force_cleanup(self):
         """强制清理所有资源"""
+        self.status.end_phase()
         print("正在清理资源...")
         
+        # 停止资源监控
+        self.supervisor.stop()
+        
+        # 关闭全文索引
+        if self.search_index:
+            try:
+                self.search_index.close()
+            except Exception:
+                pass
+            self.search_index = None
+        
         # 关闭主浏览器
         if self.driver:
             try:
@@ -83,6 +2048,14 @@ class UKBiobankScraperSelenium:
             except:
                 pass
         
+        # 关闭标签页池
+        if self.tab_pool:
+            self.tab_pool.close()
+        
+        # 关闭HTTP会话的预热浏览器
+        if self.http_pool:
+            self.http_pool.close()
+        
         # 关闭所有活跃的浏览器实例
         for driver in self.active_drivers:
             try:
@@ -96,23 +2069,55 @@ class UKBiobankScraperSelenium:
         print("资源清理完成")
     
     def _kill_chrome_processes(self):
-        """强制杀死Chrome相关进程"""
+        """强制杀死本程序启动的Chrome相关进程"""
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    if 'chrome' in proc.info['name'].lower():
-                        proc.terminate()
-                        print("Terminated Chrome process:", proc.info['pid'])
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            BrowserSupervisor.kill_own_browsers()
         except Exception as e:
             print("Error cleaning Chrome processes:", e)
     
+    def _launch_driver(self, page_load_strategy=None):
+        """创建浏览器实例并登记到资源监控"""
+        driver = self._create_driver(self.headless, page_load_strategy=page_load_strategy)
+        if driver:
+            self.supervisor.register(driver)
+        else:
+            # 浏览器无法启动同样计入错误率，持续失败时由熔断器暂停请求
+            self.circuit_breaker.record(False)
+        return driver
+    
+    def _quit_driver(self, driver):
+        """关闭浏览器实例并取消登记"""
+        self.supervisor.unregister(driver)
+        try:
+            driver.quit()
+        except:
+            pass
+        if driver in self.active_drivers:
+            self.active_drivers.remove(driver)
+    
+    def _recycle_driver(self, driver):
+        """资源监控回调：回收超限的浏览器"""
+        if self.tab_pool and self.tab_pool.driver is driver:
+            # 标签页池等当前加载结束后整体重启
+            self.tab_pool.request_recycle()
+        elif self.http_pool and self.http_pool.driver is driver:
+            # 'http' 模式的预热浏览器：关闭后会话继续使用，需要重新预热时再启动
+            self.http_pool.release_driver()
+        elif driver is self.driver:
+            # 常驻浏览器：关闭后零散页面改由 _render_page 渲染
+            self.driver = None
+            self._quit_driver(driver)
+        elif driver in self.active_drivers:
+            # 独立进程模式：直接关闭，进行中的页面会按失败重试
+            self._quit_driver(driver)
+    
     @staticmethod
-    def _create_driver(headless=True):
+    def _create_driver(headless=True, page_load_strategy=None):
         """创建独立的Chrome WebDriver实例（用于多线程）"""
         try:
             chrome_options = Options()
+            if page_load_strategy:
+                chrome_options.page_load_strategy = page_load_strategy
             
             if headless:
                 chrome_options.add_argument('--headless')
@@ -139,11 +2144,7 @@ class UKBiobankScraperSelenium:
             # 修改navigator.webdriver标志
             if driver:
                 driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    })
-                '''
+                'source': HIDE_WEBDRIVER_SCRIPT
             })
             
             return driver
@@ -155,7 +2156,7 @@ class UKBiobankScraperSelenium:
     def _init_driver(self):
         """初始化Chrome WebDriver"""
         try:
-            self.driver = self._create_driver(self.headless)
+            self.driver = self._launch_driver()
             
             if self.driver:
                 print("Chrome WebDriver 初始化成功")
@@ -174,6 +2175,85 @@ class UKBiobankScraperSelenium:
             print("- 手动下载ChromeDriver并添加到PATH")
             raise
     
+    def _get_tab_pool(self) -> TabPool:
+        """获取（必要时启动）共享浏览器的标签页池"""
+        with self.progress_lock:
+            if not self.tab_pool:
+                pool = TabPool(
+                    lambda: self._launch_driver(page_load_strategy='none'),
+                    tabs=self.tabs_per_browser,
+                    on_driver_closed=self.supervisor.unregister,
+                    should_stop=lambda: self.should_stop
+                )
+                pool.start()
+                self.tab_pool = pool
+            return self.tab_pool
+    
+    def _get_http_pool(self) -> HttpSessionPool:
+        """获取（必要时创建）浏览器预热的HTTP会话池"""
+        with self.progress_lock:
+            if not self.http_pool:
+                self.http_pool = HttpSessionPool(
+                    self._launch_driver,
+                    warmup_url=self.base_url + "?_publication_date=2020-01-01%2C",
+                    on_driver_closed=self.supervisor.unregister
+                )
+            return self.http_pool
+    
+    def _render_page(self, url: str, wait_seconds: float = 2) -> str:
+        """
+        用浏览器加载页面并返回渲染后的HTML
+        
+        Args:
+            url: 页面地址
+            wait_seconds: 加载后等待动态内容的秒数
+            
+        Returns:
+            页面HTML
+        """
+        if self.browser_mode == 'http':
+            # 服务端直出的HTML无需等待脚本执行
+            return self._get_http_pool().fetch(url)
+        
+        if self.browser_mode == 'cdp':
+            return self._render_page_cdp(url, wait_seconds)
+        
+        # 浏览器总内存超限时等待
+        if not self.supervisor.acquire_lease(lambda: self.should_stop):
+            raise BrowserUnavailableError("程序已停止")
+        
+        if self.browser_mode == 'tabs':
+            return self._get_tab_pool().render(url, wait_seconds)
+        
+        # 创建独立的浏览器实例
+        driver = self._launch_driver()
+        if not driver:
+            raise BrowserUnavailableError("无法创建浏览器实例")
+        
+        # 将驱动添加到活跃列表
+        self.active_drivers.append(driver)
+        try:
+            driver.get(url)
+            time.sleep(wait_seconds)
+            return driver.page_source
+        finally:
+            # 确保关闭浏览器实例
+            self._quit_driver(driver)
+    
+    def _render_page_cdp(self, url: str, wait_seconds: float) -> str:
+        """'cdp' 模式下的单次渲染（检测总页数等零散请求；批量任务由 _iter_completed_cdp 处理）"""
+        async def fetch():
+            browser = CDPBrowser(chrome_path=self.chrome_path, headless=self.headless)
+            self.cdp_browsers += 1
+            try:
+                await browser.start()
+                return await browser.fetch_html(url, wait_seconds)
+            finally:
+                await browser.close()
+                self.cdp_browsers -= 1
+        
+        return asyncio.run(fetch())
+    
     def get_total_pages(self):
         """
         获取搜索结果的总页数
@@ -181,20 +2261,21 @@ class UKBiobankScraperSelenium:
         Returns:
             总页数，如果无法获取则返回-1
         """
-        if not self.driver:
-            print("WebDriver未初始化")
-            return -1
-        
         try:
             # 直接访问搜索页面（不添加page参数）
             url = self.base_url + "?_publication_date=2020-01-01%2C"
             print("正在检测总页数:", url)
             
-            self.driver.get(url)
-            time.sleep(2)
+            driver = self.driver
+            if driver:
+                driver.get(url)
+                time.sleep(2)
+                html = driver.page_source
+            else:
+                # 没有常驻 WebDriver 的模式（'cdp'/'tabs'/'http'）走各后端共用的渲染入口
+                html = self._render_page(url, 2)
             
             # 获取页面HTML
-            html = self.driver.page_source
             soup = BeautifulSoup(html, 'html.parser')
             
             # 查找包含论文数量的元素
@@ -206,12 +2287,10 @@ class UKBiobankScraperSelenium:
                 print(f"找到计数元素: {counts_text}")
                 
                 # 从文本中提取总数，例如 "1 to 10 of 2239 results found"
-                import re
-                match = re.search(r'of (\d+) results found', counts_text)
-                if match:
-                    total_results = int(match.group(1))
-                    # 假设每页10篇论文
-                    total_pages = (total_results + 9) // 10  # 向上取整
+                total_results = self._parse_result_total(soup)
+                if total_results is not None:
+                    self.result_total = total_results
+                    total_pages = (total_results + self.PAGE_SIZE - 1) // self.PAGE_SIZE  # 向上取整
                     print(f"检测到总论文数: {total_results}")
                     print(f"计算得出总页数: {total_pages}")
                     return total_pages
@@ -224,6 +2303,24 @@ class UKBiobankScraperSelenium:
             print(f"获取总页数失败: {e}")
             return -1  # 返回默认值
     
+    @staticmethod
+    def _parse_result_total(soup) -> int:
+        """从列表页的 facetwp-facet-counts 元素解析结果总数，找不到时返回 None"""
+        counts_element = soup.find('div', class_='facetwp-facet-counts')
+        if not counts_element:
+            return None
+        match = re.search(r'of ([\d,]+) results found', counts_element.get_text(strip=True))
+        return int(match.group(1).replace(',', '')) if match else None
+    
+    def _read_result_total(self) -> int:
+        """重新渲染列表首页读取当前结果总数（用于抓取后的漂移检测）"""
+        try:
+            html = self._render_page(self.base_url + "?_publication_date=2020-01-01%2C", 2)
+            return self._parse_result_total(BeautifulSoup(html, 'html.parser'))
+        except Exception as e:
+            print(f"读取结果总数失败: {e}")
+            return None
+    
     
     
     
@@ -231,83 +2328,137 @@ class UKBiobankScraperSelenium:
     
     def _extract_article_info_from_list(self, li_element):
         """从列表页的li元素中提取基本信息（只保留标题和链接）"""
-        info = {
-            'page': '',
-            'title': '',
-            'link': '',
-            'disease_areas': [],  # 疾病领域数组
-            'last_updated': '',   # 最后更新时间
-            'authors': '',        # 作者
-            'publish_date': '',   # 发布日期
-            'journal': '',        # 期刊
-            'pubmed_id': '',      # PubMed ID
-            'doi': '',           # DOI
-            'abstract': '',        # 摘要
-            'details_saved': '否'
-        }
+        info = Publication(details_saved='否')
         
         # 提取标题和链接
         link_elem = li_element.find('a', class_='link--stretched-before')
         if link_elem:
             info['title'] = link_elem.get_text(strip=True)
-            href = link_elem.get('href', '')
-            if href.startswith('http'):
-                info['link'] = href
-            elif href.startswith('/'):
-                info['link'] = f"https://www.ukbiobank.ac.uk{href}"
+            info['link'] = normalize_publication_link(link_elem.get('href', ''))
         
         return info if info['title'] and info['link'] else None
     
     
     
     
-    def upsert_to_csv(self, publication: Dict[str, str], filename: str = 'publications.csv'):
+    def upsert_to_csv(self, publication, filename: str = 'publications.csv'):
         """按link作为唯一键进行CSV更新/插入，并保证字段齐全"""
-        if not publication or not publication.get('link'):
-            return
-        fieldnames = ['page', 'title', 'link', 'disease_areas', 'last_updated', 'authors', 'publish_date', 'journal', 'pubmed_id', 'doi', 'abstract', 'details_saved']
+        self.upsert_many_to_csv([publication], filename)
+    
+    def attach_search_index(self, db_path: str, csv_filename: str) -> PublicationIndex:
+        """
+        启用全文索引，记录数与CSV不一致时先从CSV全量重建
+        
+        之后只有写入CSV的记录会同步到索引，断点续传时已完成（或内容未变化而跳过写入）
+        的记录不会再写入，因此启用时需要先补齐。
+        """
+        index = PublicationIndex(db_path)
         with self.file_lock:
-            rows = []
-            existing_index = {}
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
-                    reader = csv.DictReader(f)
-                    for i, row in enumerate(reader):
-                        rows.append(row)
-                        if row.get('link'):
-                            existing_index[row['link']] = i
-            # 规范化待写入数据
-            pub_copy = {k: '' for k in fieldnames}
-            pub_copy.update(publication)
-            if isinstance(pub_copy.get('disease_areas'), list):
-                pub_copy['disease_areas'] = '; '.join(pub_copy['disease_areas'])
-            # 写回或追加（合并旧值，避免清空已有字段，如 page）
-            if pub_copy['link'] in existing_index:
-                idx = existing_index[pub_copy['link']]
-                existing_row = rows[idx]
-                merged = existing_row.copy()
-                for key in fieldnames:
-                    new_val = pub_copy.get(key, '')
-                    # 若新值非空则覆盖；否则保留旧值（确保不会清空如 page 之类已存在字段）
-                    if new_val not in [None, '', []]:
-                        merged[key] = new_val
-                rows[idx] = merged
-            else:
-                rows.append(pub_copy)
+            csv_count = len(self._cached_csv_rows(csv_filename)[0])
+        indexed = index.count()
+        if indexed != csv_count:
+            print(f"全文索引记录数（{indexed}）与CSV（{csv_count}）不一致，正在从CSV重建...")
+            index.rebuild_from_csv(csv_filename)
+        self.search_index = index
+        return index
+    
+    def _cached_csv_rows(self, filename: str):
+        """
+        返回CSV的记录列表和 link -> 下标 索引（调用方需持有 file_lock）
+        
+        解析结果按文件缓存，文件大小或修改时间变化（被外部改写）时重新读取，
+        避免每次写入都重新解析整个CSV。
+        """
+        try:
+            stat = os.stat(filename)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        cache = self._csv_cache
+        if cache and cache['filename'] == filename and cache['signature'] == signature:
+            return cache['rows'], cache['index']
+        rows = load_publications_csv(filename) if signature else []
+        index = {row.link: i for i, row in enumerate(rows) if row.link}
+        self._csv_cache = {'filename': filename, 'signature': signature, 'rows': rows, 'index': index}
+        return rows, index
+    
+    def _write_csv_rows(self, rows: List[Publication], filename: str):
+        """重写CSV并刷新缓存的文件签名（调用方需持有 file_lock）"""
+        try:
             with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=PUBLICATION_FIELDS)
                 writer.writeheader()
                 for row in rows:
-                    writer.writerow(row)
+                    writer.writerow(row.to_row())
+            stat = os.stat(filename)
+            self._csv_cache['signature'] = (stat.st_mtime_ns, stat.st_size)
+        except Exception:
+            # 写入失败时缓存与文件可能不一致，下次重新读取
+            self._csv_cache = None
+            raise
+    
+    def remove_from_csv(self, links, filename: str = 'publications.csv') -> int:
+        """按link删除CSV中的记录（同步删除全文索引），返回删除条数"""
+        with self.file_lock:
+            rows, existing_index = self._cached_csv_rows(filename)
+            drop = {link for link in links if link in existing_index}
+            if not drop:
+                return 0
+            rows[:] = [row for row in rows if row.link not in drop]
+            existing_index.clear()
+            existing_index.update({row.link: i for i, row in enumerate(rows) if row.link})
+            self._write_csv_rows(rows, filename)
+            if self.search_index:
+                try:
+                    self.search_index.delete(drop)
+                except Exception as e:
+                    print(f"更新全文索引失败: {e}")
+        return len(drop)
+    
+    def upsert_many_to_csv(self, publications, filename: str = 'publications.csv'):
+        """批量按link更新/插入CSV（只重写一次文件）"""
+        # 规范化待写入数据（调用方传入的 Publication 对象不直接存入缓存）
+        pending = []
+        for publication in publications:
+            if not publication or not publication.get('link'):
+                continue
+            if isinstance(publication, Publication):
+                pending.append((publication, False))
+            else:
+                pending.append((Publication.from_row(publication), True))
+        if not pending:
+            return
+        with self.file_lock:
+            rows, existing_index = self._cached_csv_rows(filename)
+            for pub, owned in pending:
+                # 写回或追加（合并旧值，避免清空已有字段，如 page）
+                if pub.link in existing_index:
+                    rows[existing_index[pub.link]].merge(pub)
+                else:
+                    existing_index[pub.link] = len(rows)
+                    rows.append(pub if owned else pub.copy())
+            self._write_csv_rows(rows, filename)
+            # 同步更新全文索引（只写入本次变动的记录）
+            if self.search_index:
+                try:
+                    self.search_index.upsert([rows[existing_index[pub.link]] for pub, _ in pending])
+                except Exception as e:
+                    print(f"更新全文索引失败: {e}")
     
     
     
-    def _load_progress(self, progress_filename: str) -> Dict:
-        """加载进度文件"""
+    def _load_progress(self, progress_filename: str, quiet: bool = False) -> Dict:
+        """
+        加载进度文件
+        
+        quiet=True 用于抓取过程中的读-改-写，不输出进度摘要
+        """
         if os.path.exists(progress_filename):
             try:
                 with open(progress_filename, 'r', encoding='utf-8') as f:
                     progress = json.load(f)
+                if quiet:
+                    return progress
                 print(f"✓ 发现进度文件: {progress_filename}")
                 print(f"  - 总页数: {progress.get('total_pages', 0)}")
                 print(f" - 已完成: {len(progress.get('completed_pages', []))} 页")
@@ -316,7 +2467,7 @@ class UKBiobankScraperSelenium:
                 print(f"  - 最后更新: {progress.get('last_update', '未知')}")
                 return progress
             except Exception as e:
-                print(f"✗ 加载进度文件失败: {e}")
+                self.status.log(f"✗ 加载进度文件失败: {e}")
                 return {}
         return {}
     
@@ -330,7 +2481,34 @@ class UKBiobankScraperSelenium:
             with open(progress_filename, 'w', encoding='utf-8') as f:
                 json.dump(progress, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            print(f"保存进度文件失败: {e}")
+            self.status.log(f"保存进度文件失败: {e}")
+    
+    def _get_retry_tracker(self, csv_filename: str) -> RetryTracker:
+        """获取与CSV文件对应的重试状态跟踪器"""
+        state_filename = csv_filename.replace('.csv', '_retry.json')
+        with self.progress_lock:
+            if not self.retry_tracker or self.retry_tracker.state_filename != state_filename:
+                self.retry_tracker = RetryTracker(
+                    state_filename,
+                    csv_filename.replace('.csv', '_dead_letter.csv')
+                )
+            return self.retry_tracker
+    
+    def _get_fingerprints(self, csv_filename: str) -> ContentFingerprints:
+        """获取与CSV文件对应的内容指纹"""
+        state_filename = csv_filename.replace('.csv', '_fingerprints.json')
+        with self.progress_lock:
+            if not self.fingerprints or self.fingerprints.state_filename != state_filename:
+                self.fingerprints = ContentFingerprints(state_filename)
+            return self.fingerprints
+    
+    def _get_scheduler(self, csv_filename: str) -> CrawlScheduler:
+        """获取与CSV文件对应的任务调度器"""
+        state_filename = csv_filename.replace('.csv', '_schedule.json')
+        with self.progress_lock:
+            if not self.scheduler or self.scheduler.state_filename != state_filename:
+                self.scheduler = CrawlScheduler(state_filename)
+            return self.scheduler
     
     def _get_pending_pages(self, total_pages: int, progress: Dict) -> List[int]:
         """获取待处理的页面列表"""
@@ -357,30 +2535,24 @@ class UKBiobankScraperSelenium:
             print("没有需要补偿的失败页面")
             return
         print(f"开始补偿失败页面，共 {len(failed_pages)} 页: {failed_pages[:10]}{'...' if len(failed_pages)>10 else ''}")
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_page = {}
-            for page_num in failed_pages:
-                future = executor.submit(
-                    self._fetch_page_links_only,
-                    page_num,
-                    csv_filename,
-                    progress_filename
-                )
-                future_to_page[future] = page_num
-            for future in as_completed(future_to_page):
-                page_num = future_to_page[future]
-                try:
-                    _ = future.result()
-                except Exception as e:
-                    print(f"补偿页面 {page_num} 失败: {e}")
+        jobs = [(page_num, csv_filename, progress_filename) for page_num in failed_pages]
+        for job, _, error in self._iter_completed('listing', jobs, max_workers):
+            if error:
+                self.status.log(f"补偿页面 {job[0]} 失败: {error}")
 
-    def fetch_all_article_details(self, csv_filename: str, max_workers: int = 10) -> Dict[str, any]:
+    def fetch_all_article_details(self, csv_filename: str, max_workers: int = 10,
+                                  recheck: bool = False, refresh: bool = False) -> Dict[str, any]:
         """
         第二阶段：获取所有文章的详细信息
         
+        任务按调度器打分排序（新页面、缺字段、失败少的优先），设置了时间预算时
+        先处理价值最高的文章。
+        
         Args:
             csv_filename: CSV文件名
             max_workers: 最大并发数
+            recheck: 是否同时重新获取已完成但缺少摘要/DOI/PMID的文章
+            refresh: 是否刷新全部已完成文章（内容指纹未变化时跳过提取和写入）
             
         Returns:
             包含统计信息的字典
@@ -389,96 +2561,561 @@ class UKBiobankScraperSelenium:
             print("CSV文件不存在，无法获取详情")
             return {'success': False, 'error': 'CSV文件不存在'}
         
-        # 读取所有需要获取详情的文章
-        articles_to_process = []
-        with self.file_lock:
-            with open(csv_filename, 'r', encoding='utf-8-sig', newline='') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if str(row.get('details_saved', '')).strip() in ['', '否', 'No', 'False', '0']:
-                        articles_to_process.append(row)
+        # 先按PMID批量补全已有记录的缺失字段（不改变完成标记，请求过的PMID不再重复请求）
+        self.enrich_from_pubmed(csv_filename)
+        
+        # 读取所有需要获取详情（或重新检查）的文章，按优先级排序
+        with self.file_lock:
+            publications = load_publications_csv(csv_filename)
+        tracker = self._get_retry_tracker(csv_filename)
+        scheduler = self._get_scheduler(csv_filename)
+        planned = scheduler.plan_details(
+            publications, recheck=recheck, refresh=refresh,
+            failure_counts={p.link: tracker.attempts(p.link) for p in publications if p.link}
+        )
+        articles_to_process = [pub for _, pub in planned]
+        recheck_count = len([kind for kind, _ in planned if kind == 'recheck'])
+        refresh_count = len([kind for kind, _ in planned if kind == 'refresh'])
+        del publications, planned  # 只保留待处理的记录，其余历史记录可以释放
+        
+        if not articles_to_process:
+            print("所有文章详情已获取完成")
+            return {'success': True, 'message': '所有文章详情已获取完成'}
+        if recheck_count:
+            print(f"其中 {recheck_count} 篇为缺少字段的已完成文章（重新检查）")
+        if refresh_count:
+            print(f"其中 {refresh_count} 篇为刷新检查的已完成文章")
+        
+        # 跳过死信链接和仍处于退避期的链接
+        now = time.time()
+        dead_count = len([a for a in articles_to_process if a.get('link') in tracker.dead_letter])
+        eligible = [a for a in articles_to_process if tracker.is_eligible(a.get('link', ''), now)]
+        backoff_count = len(articles_to_process) - len(eligible) - dead_count
+        if dead_count or backoff_count:
+            print(f"跳过 {dead_count} 篇死信文章，{backoff_count} 篇处于退避等待中")
+        articles_to_process = eligible
+        
+        if not articles_to_process:
+            print("当前没有可重试的文章")
+            return {'success': True, 'message': '当前没有可重试的文章',
+                    'dead_letter_count': dead_count, 'backoff_count': backoff_count}
+        
+        print(f"\n开始获取 {len(articles_to_process)} 篇文章的详细信息...")
+        print("=" * 80)
+        
+        start_time = time.time()
+        successful_count = 0
+        failed_count = 0
+        
+        # 并发获取详情
+        jobs = []
+        job_index = {}
+        for idx, article in enumerate(articles_to_process, 1):
+            # 直接使用本次读取的记录（不与CSV缓存共享），带上现有字段，内容未变化时可直接复用
+            if not article['link']:
+                continue
+            jobs.append((article, csv_filename))
+            job_index[id(article)] = (idx, article)
+        
+        # 处理完成的任务
+        fingerprints = self._get_fingerprints(csv_filename)
+        fingerprints.reset_stats()
+        processed_count = 0
+        written_links = set()
+        for job, success, error in self._iter_completed('detail', jobs, max_workers, scheduler):
+            processed_count += 1
+            idx, article = job_index[id(job[0])]
+            if error:
+                failed_count += 1
+                self.status.log(f"✗ 第 {idx}/{len(articles_to_process)} 篇文章详情获取异常: {error}")
+            elif success:
+                successful_count += 1
+                written_links.add(job[0]['link'])
+            else:
+                failed_count += 1
+                self.status.log(f"✗ 第 {idx}/{len(articles_to_process)} 篇文章详情获取失败: {article['title'][:50]}...")
+        
+        fingerprints.save()
+        content_changes = dict(fingerprints.stats)
+        
+        # 只对本轮写入的详情做PubMed补全（如站点缺失的摘要）
+        self.enrich_from_pubmed(csv_filename, links=written_links)
+        
+        elapsed_time = time.time() - start_time
+        
+        print("\n" + "=" * 80)
+        print("详情获取完成！")
+        print("=" * 80)
+        print(f"总文章数: {len(articles_to_process)}")
+        print(f"成功获取: {successful_count}")
+        print(f"获取失败: {failed_count}")
+        print(f"耗时: {elapsed_time:.2f} 秒")
+        if elapsed_time > 0:
+            print(f"平均速度: {successful_count / elapsed_time:.2f} 篇/秒")
+        if len(jobs) > processed_count:
+            print(f"留待下次运行: {len(jobs) - processed_count}")
+        print(f"内容对比: 新增 {content_changes['new']} | 有变化 {content_changes['changed']} | "
+              f"未变化 {content_changes['unchanged']}（未变化的记录未重新提取和写入）")
+        
+        return {
+            'success': True,
+            'total_articles': len(articles_to_process),
+            'successful_count': successful_count,
+            'failed_count': failed_count,
+            'dead_letter_count': len(tracker.dead_letter),
+            'backoff_count': backoff_count,
+            'recheck_count': recheck_count,
+            'refresh_count': refresh_count,
+            'content_changes': content_changes,
+            'deferred_count': len(jobs) - processed_count,
+            'elapsed_time': elapsed_time
+        }
+    
+    def discover_from_sitemap(self, csv_filename: str, sitemap_url: str = None) -> Dict[str, any]:
+        """
+        通过XML站点地图发现文章链接（替代逐页渲染列表页）
+        
+        新链接写入占位行，lastmod 变化的已有链接重新标记为待获取详情，
+        交由第二阶段处理。链接与列表页使用同样的规范化；站点地图不带发布日期，
+        因此先按 lastmod 排除明显早于筛选起始日期的文章，其余在详情阶段按发布日期
+        排除（见 _exclude_publications），与列表页的日期筛选保持一致。
+        
+        Args:
+            csv_filename: CSV文件名
+            sitemap_url: 站点地图地址，默认 <站点根>/wp-sitemap.xml（可用 file:// 指向本地样例）
+            
+        Returns:
+            包含统计信息的字典
+        """
+        sitemap_url = sitemap_url or urllib.parse.urljoin(self.base_url, '/wp-sitemap.xml')
+        state_filename = csv_filename.replace('.csv', '_sitemap.json')
+        stats = {'success': False, 'total': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'filtered': 0,
+                 'sitemap_fetches': 0}
+        date_from = self.filter_query.get('publication_date_from', '')
+        
+        state = {}
+        if os.path.exists(state_filename):
+            try:
+                with open(state_filename, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except Exception as e:
+                print(f"加载站点地图状态失败: {e}")
+        lastmods = state.get('lastmod', {})
+        excluded = set(state.get('excluded', []))
+        
+        # 按规范化链接匹配已有记录（兼容旧版本写入的未规范化链接）
+        with self.file_lock:
+            rows, _ = self._cached_csv_rows(csv_filename)
+            existing = {normalize_publication_link(pub.link): pub.link for pub in rows if pub.link}
+            # 旧版本站点地图模式写入的早于筛选日期的记录一并移除
+            stale = [pub.link for pub in rows if self._outside_date_filter(pub.publish_date)]
+        if stale:
+            self.remove_from_csv(stale, csv_filename)
+            excluded.update(normalize_publication_link(link) for link in stale)
+            for link in stale:
+                existing.pop(normalize_publication_link(link), None)
+            print(f"移除发布日期早于 {date_from} 的已有记录: {len(stale)} 条")
+        
+        print(f"正在读取站点地图: {sitemap_url}")
+        reader = SitemapReader()
+        site_prefix = normalize_publication_link(self.base_url)
+        pending = []
+        seen = set()
+        try:
+            for loc, lastmod in reader.iter_urls(sitemap_url):
+                url = normalize_publication_link(loc)
+                # 只保留出版物栏目下的文章（跳过列表页本身和规范化后重复的链接）
+                if not url.startswith(site_prefix) or url == site_prefix or url in seen:
+                    continue
+                seen.add(url)
+                if url in excluded or (date_from and lastmod and lastmod[:10] < date_from):
+                    # 最后修改早于筛选起始日期的文章，发布日期只会更早
+                    stats['filtered'] += 1
+                    continue
+                stats['total'] += 1
+                if url not in existing:
+                    stats['new'] += 1
+                    pending.append(Publication(link=url, details_saved='否'))
+                    existing[url] = url
+                elif lastmod and url in lastmods and lastmods[url] != lastmod:
+                    stats['changed'] += 1
+                    pending.append(Publication(link=existing[url], details_saved='否'))
+                else:
+                    stats['unchanged'] += 1
+                if lastmod:
+                    lastmods[url] = lastmod
+        except Exception as e:
+            print(f"✗ 读取站点地图失败: {e}")
+            stats['error'] = str(e)
+            return stats
+        stats['sitemap_fetches'] = reader.fetch_count
+        
+        if pending:
+            self.upsert_many_to_csv(pending, csv_filename)
+        try:
+            with self.file_lock, open(state_filename, 'w', encoding='utf-8') as f:
+                json.dump({'sitemap_url': sitemap_url, 'lastmod': lastmods, 'excluded': sorted(excluded),
+                           'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                          f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"保存站点地图状态失败: {e}")
+        
+        stats['success'] = True
+        print(f"✓ 站点地图共 {stats['total']} 篇文章（请求 {stats['sitemap_fetches']} 个XML）| "
+              f"新增: {stats['new']} | 有更新: {stats['changed']} | 未变化: {stats['unchanged']} | "
+              f"早于 {date_from} 已排除: {stats['filtered']}")
+        return stats
+    
+    def _outside_date_filter(self, publish_date: str) -> bool:
+        """发布日期是否早于筛选起始日期（无法解析的日期不排除）"""
+        date_from = self.filter_query.get('publication_date_from', '')
+        iso_date = PublicationIndex._iso_date(publish_date)
+        return bool(date_from and iso_date and iso_date < date_from)
+    
+    def _exclude_publications(self, links: List[str], csv_filename: str):
+        """
+        移除发布日期不符合筛选条件的文章（站点地图发现的链接在获取详情后才知道发布日期）
+        
+        链接记入站点地图状态的 excluded 列表，之后读取站点地图时直接跳过。
+        """
+        self.remove_from_csv(links, csv_filename)
+        state_filename = csv_filename.replace('.csv', '_sitemap.json')
+        with self.file_lock:
+            if not os.path.exists(state_filename):
+                return
+            try:
+                with open(state_filename, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                excluded = set(state.get('excluded', []))
+                excluded.update(normalize_publication_link(link) for link in links)
+                state['excluded'] = sorted(excluded)
+                with open(state_filename, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                self.status.log(f"保存站点地图状态失败: {e}")
+    
+    # 可由PubMed补全/校验的字段
+    PUBMED_FIELDS = ['authors', 'journal', 'publish_date', 'doi', 'abstract']
+    
+    def enrich_from_pubmed(self, csv_filename: str, verify: bool = False, links=None) -> Dict[str, any]:
+        """
+        按PMID批量从PubMed补全作者、期刊、发布日期、DOI和摘要
+        
+        只填充缺失字段，不改变 details_saved：待获取（含因站点地图 lastmod 变化或刷新而
+        重新标记）的记录仍由详情阶段渲染。请求过的PMID记录在 *_pubmed.json 中，
+        PubMed 同样缺少的字段不会每次运行都重新请求（PMID变化或请求失败时才会再次请求）。
+        
+        Args:
+            csv_filename: CSV文件名
+            verify: 是否同时校验已有字段并统计不一致数量（不会覆盖站点数据，忽略请求记录）
+            links: 只处理这些链接的记录（None 表示全部）
+            
+        Returns:
+            包含统计信息的字典
+        """
+        stats = {'candidates': 0, 'fetched': 0, 'filled_fields': 0, 'mismatches': 0, 'skipped': 0}
+        if not self.pubmed_client or self.should_stop or not os.path.exists(csv_filename):
+            return stats
+        if links is not None and not links:
+            return stats
+        
+        def is_missing(pub, field):
+            value = pub[field]
+            return not value or (field == 'abstract' and value in ['未找到摘要', '获取失败'])
+        
+        state_filename = csv_filename.replace('.csv', '_pubmed.json')
+        requested = {}
+        if os.path.exists(state_filename):
+            try:
+                with open(state_filename, 'r', encoding='utf-8') as f:
+                    requested = json.load(f).get('requested', {})
+            except Exception as e:
+                print(f"加载PubMed请求记录失败: {e}")
+        
+        with self.file_lock:
+            rows, _ = self._cached_csv_rows(csv_filename)
+            candidates = [
+                pub.copy() for pub in rows
+                if (links is None or pub.link in links) and pub.pubmed_id.strip().isdigit() and (
+                    verify or any(is_missing(pub, f) for f in self.PUBMED_FIELDS)
+                )
+            ]
+        
+        def already_requested(pub):
+            # 请求过且缺失的字段PubMed当时也没有（记录被重置等导致缺失PubMed已有的字段时重新请求）
+            entry = requested.get(pub.pubmed_id.strip())
+            return entry is not None and not any(
+                is_missing(pub, f) and f in entry['fields'] for f in self.PUBMED_FIELDS
+            )
         
-        if not articles_to_process:
-            print("所有文章详情已获取完成")
-            return {'success': True, 'message': '所有文章详情已获取完成'}
+        if not verify:
+            pending = [pub for pub in candidates if not already_requested(pub)]
+            stats['skipped'] = len(candidates) - len(pending)
+            candidates = pending
+        stats['candidates'] = len(candidates)
+        if not candidates:
+            return stats
         
-        print(f"\n开始获取 {len(articles_to_process)} 篇文章的详细信息...")
-        print("=" * 80)
+        print(f"\n正在从PubMed批量获取 {len(candidates)} 篇文章的元数据...")
+        metadata = self.pubmed_client.fetch([pub.pubmed_id for pub in candidates])
+        stats['fetched'] = len(metadata)
         
-        start_time = time.time()
-        successful_count = 0
-        failed_count = 0
+        # 记录已请求的PMID（请求失败的不记录，下次重试）
+        failed_ids = getattr(self.pubmed_client, 'failed_ids', set())
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for pmid in {pub.pubmed_id.strip() for pub in candidates} - failed_ids:
+            record = metadata.get(pmid, {})
+            requested[pmid] = {'at': fetched_at, 'fields': [f for f in self.PUBMED_FIELDS if record.get(f)]}
+        try:
+            with open(state_filename, 'w', encoding='utf-8') as f:
+                json.dump({'requested': requested}, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存PubMed请求记录失败: {e}")
         
-        # 使用线程池并发获取详情
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_article = {}
-            for idx, article in enumerate(articles_to_process, 1):
-                if self.should_stop:
-                    print("\n检测到停止信号，取消剩余任务...")
-                    break
-                    
-                pub_info = {
-                    'title': article.get('title', ''),
-                    'link': article.get('link', '')
-                }
-                
-                if not pub_info['link']:
+        updated = []
+        for pub in candidates:
+            record = metadata.get(pub.pubmed_id.strip())
+            if not record:
+                continue
+            changed = False
+            for field in self.PUBMED_FIELDS:
+                if not record.get(field):
                     continue
-                    
-                future = executor.submit(
-                    self._fetch_article_details_simple,
-                    pub_info,
-                    csv_filename
-                )
-                future_to_article[future] = (idx, article)
+                if is_missing(pub, field):
+                    pub[field] = record[field]
+                    stats['filled_fields'] += 1
+                    changed = True
+                elif verify and ' '.join(pub[field].lower().split()) != ' '.join(record[field].lower().split()):
+                    stats['mismatches'] += 1
+            if changed:
+                updated.append(pub)
+        
+        if updated:
+            # 只写入补全的字段，不带 details_saved，避免覆盖详情阶段的标记
+            self.upsert_many_to_csv(
+                [Publication(link=pub.link, **{f: pub[f] for f in self.PUBMED_FIELDS}) for pub in updated],
+                csv_filename
+            )
+        print(f"✓ PubMed补全完成: 获取 {stats['fetched']} 条，补全 {stats['filled_fields']} 个字段"
+              + (f"，不一致 {stats['mismatches']} 处" if verify else ''))
+        return stats
+    
+    def _iter_completed(self, kind: str, jobs: List, max_workers: int, scheduler: 'CrawlScheduler' = None):
+        """
+        并发执行第一/第二阶段任务，按完成顺序产出 (job, result, error)
+        
+        kind 为 'listing' 时 job 是 (page_num, csv_filename, progress_filename)，
+        为 'detail' 时 job 是 (pub_info, csv_filename)。'cdp' 模式下由单个事件循环驱动。
+        jobs 按给定顺序提交；设置了 self.deadline 时，预计无法在截止时间前完成的任务
+        不再提交，留待下次运行。传入 scheduler 时记录每个任务的结果和耗时。
+        执行期间的吞吐量、ETA等由 self.status 汇总输出。
+        """
+        self.status.begin_phase(kind, len(jobs))
+        try:
+            if self.browser_mode == 'cdp':
+                yield from self._iter_completed_cdp(kind, jobs, scheduler)
+            else:
+                yield from self._iter_completed_threads(kind, jobs, max_workers, scheduler)
+        finally:
+            self.status.end_phase()
+            if scheduler:
+                # 调度历史每个阶段只落盘一次
+                scheduler.save()
+    
+    def _iter_completed_threads(self, kind: str, jobs: List, max_workers: int,
+                                scheduler: 'CrawlScheduler' = None):
+        """
+        线程池模式：按顺序惰性提交任务，按完成顺序产出 (job, result, error)
+        
+        'tabs' 模式下每个工作线程占用一个标签页，并发数取 tabs_per_browser（忽略 max_workers）
+        """
+        if self.browser_mode == 'tabs':
+            max_workers = self.tabs_per_browser
+        func = self._fetch_page_links_only if kind == 'listing' else self._fetch_article_details_simple
+        pending_jobs = deque(jobs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_job = {}
             
-            # 处理完成的任务
-            for future in as_completed(future_to_article):
-                if self.should_stop:
-                    print("\n正在安全停止...")
-                    break
-                    
-                idx, article = future_to_article[future]
-                try:
-                    if future.result():
-                        successful_count += 1
-                        print(f"✓ 第 {idx}/{len(articles_to_process)} 篇文章详情获取成功: {article['title'][:50]}...")
-                    else:
-                        failed_count += 1
-                        print(f"✗ 第 {idx}/{len(articles_to_process)} 篇文章详情获取失败: {article['title'][:50]}...")
-                except Exception as e:
-                    failed_count += 1
-                    print(f"✗ 第 {idx}/{len(articles_to_process)} 篇文章详情获取异常: {e}")
+            def timed(job):
+                self.status.task_started()
+                started = time.time()
+                return func(*job), time.time() - started
+            
+            def submit_more():
+                # 只保持少量任务排队，便于按优先级和时间预算逐个决定是否提交
+                while pending_jobs and len(future_to_job) < max_workers * 2:
+                    if self.should_stop:
+                        self.status.log("\n检测到停止信号，取消剩余任务...")
+                        pending_jobs.clear()
+                        return
+                    if not self._within_budget(kind, scheduler):
+                        self.status.log(f"\n时间预算不足，剩余 {len(pending_jobs)} 个任务留待下次运行")
+                        pending_jobs.clear()
+                        return
+                    job = pending_jobs.popleft()
+                    future_to_job[executor.submit(timed, job)] = job
+            
+            submit_more()
+            while future_to_job:
+                done, _ = wait(future_to_job, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = future_to_job.pop(future)
+                    try:
+                        result, duration = future.result()
+                        error = None
+                    except Exception as e:
+                        result, duration, error = None, None, e
+                    self.status.task_finished(error is None and self._job_succeeded(result))
+                    self._record_scheduled(scheduler, kind, job, result if error is None else False, duration)
+                    if self.should_stop:
+                        self.status.log("\n正在安全停止...")
+                        pending_jobs.clear()
+                        for other in future_to_job:
+                            other.cancel()
+                        return
+                    yield job, result, error
+                submit_more()
+    
+    def _within_budget(self, kind: str, scheduler: 'CrawlScheduler' = None) -> bool:
+        """按任务预计耗时判断是否还能在 self.deadline 之前完成"""
+        if not self.deadline:
+            return True
+        estimate = scheduler.estimate(kind) if scheduler else CrawlScheduler.DEFAULT_COST.get(kind, 5.0)
+        return time.time() + estimate <= self.deadline
+    
+    @staticmethod
+    def _job_succeeded(result) -> bool:
+        """任务是否成功（列表页结果为字典，详情结果为布尔值）"""
+        return result.get('success', False) if isinstance(result, dict) else bool(result)
+    
+    @staticmethod
+    def _record_scheduled(scheduler: 'CrawlScheduler', kind: str, job, result, duration: float = None):
+        """把任务结果记入调度器"""
+        if not scheduler:
+            return
+        success = UKBiobankScraperSelenium._job_succeeded(result)
+        if kind == 'listing':
+            scheduler.record('listing', job[0], success, duration)
+        else:
+            link = job[0].link
+            scheduler.record(scheduler.kind_for(link), link, success, duration)
+    
+    def _iter_completed_cdp(self, kind: str, jobs: List, scheduler: 'CrawlScheduler' = None):
+        """CDP模式：在后台线程的事件循环中并发处理全部任务"""
+        results = queue.Queue()
+        done = object()
+        deferred = []
+        func = self._fetch_page_links_async if kind == 'listing' else self._fetch_article_details_async
         
-        elapsed_time = time.time() - start_time
+        async def runner():
+            browser = CDPBrowser(chrome_path=self.chrome_path, headless=self.headless)
+            semaphore = asyncio.Semaphore(self.tabs_per_browser)
+            
+            async def run_one(job):
+                async with semaphore:
+                    # 信号量按提交顺序放行，超出时间预算的任务直接跳过
+                    if self.should_stop or not self._within_budget(kind, scheduler):
+                        deferred.append(job)
+                        return
+                    self.status.task_started()
+                    started = time.time()
+                    try:
+                        result = await func(browser, *job)
+                        self.status.task_finished(self._job_succeeded(result))
+                        self._record_scheduled(scheduler, kind, job, result, time.time() - started)
+                        results.put((job, result, None))
+                    except Exception as e:
+                        self.status.task_finished(False)
+                        self._record_scheduled(scheduler, kind, job, False)
+                        results.put((job, None, e))
+            
+            self.cdp_browsers += 1
+            try:
+                await browser.start()
+                await asyncio.gather(*(run_one(job) for job in jobs))
+            finally:
+                await browser.close()
+                self.cdp_browsers -= 1
         
-        print("\n" + "=" * 80)
-        print("详情获取完成！")
-        print("=" * 80)
-        print(f"总文章数: {len(articles_to_process)}")
-        print(f"成功获取: {successful_count}")
-        print(f"获取失败: {failed_count}")
-        print(f"耗时: {elapsed_time:.2f} 秒")
-        if elapsed_time > 0:
-            print(f"平均速度: {successful_count / elapsed_time:.2f} 篇/秒")
+        failure = {}
         
-        return {
-            'success': True,
-            'total_articles': len(articles_to_process),
-            'successful_count': successful_count,
-            'failed_count': failed_count,
-            'elapsed_time': elapsed_time
-        }
+        def run():
+            try:
+                asyncio.run(runner())
+            except Exception as e:
+                failure['error'] = e
+            finally:
+                results.put(done)
+        
+        thread = threading.Thread(target=run, name='cdp-event-loop', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                yield item
+            if 'error' in failure:
+                # 浏览器启动失败等整体错误交给调用方，而不是让任务静默消失
+                raise BrowserUnavailableError(f"CDP后端运行失败: {failure['error']}") from failure['error']
+        finally:
+            # 提前退出时由停止标志让剩余任务快速结束
+            thread.join()
+            if deferred and not self.should_stop:
+                self.status.log(f"\n时间预算不足，剩余 {len(deferred)} 个任务留待下次运行")
+    
+    async def _fetch_page_links_async(self, browser: CDPBrowser, page_num: int, csv_filename: str,
+                                      progress_filename: str) -> Dict[str, any]:
+        """_fetch_page_links_only 的CDP异步版本"""
+        if self.should_stop:
+            return {'page': page_num, 'success': False, 'articles_count': 0, 'error': "程序已停止"}
+        try:
+            html = await browser.fetch_html(self._listing_url(page_num), 3)
+        except Exception as e:
+            await asyncio.to_thread(self._update_progress, page_num, False, 0, progress_filename)
+            return {'page': page_num, 'success': False, 'articles_count': 0, 'error': str(e)}
+        # 解析与写文件放到线程中，避免阻塞事件循环
+        return await asyncio.to_thread(self._process_listing_html, page_num, html, csv_filename, progress_filename)
+    
+    async def _fetch_article_details_async(self, browser: CDPBrowser, pub_info: Publication,
+                                           csv_filename: str) -> bool:
+        """_fetch_article_details_simple 的CDP异步版本"""
+        if self.should_stop:
+            return False
+        if self.circuit_breaker.state != 'closed':
+            if not await asyncio.to_thread(self.circuit_breaker.wait_until_closed, lambda: self.should_stop):
+                return False
+        try:
+            html = await browser.fetch_html(pub_info['link'], 2)
+        except BrowserUnavailableError as e:
+            self.status.log(f"  [获取详情] 失败: {e}")
+            return False
+        except Exception as e:
+            await asyncio.to_thread(self._record_detail_failure, pub_info, csv_filename, e)
+            return False
+        return await asyncio.to_thread(self._process_detail_html, pub_info, html, csv_filename)
     
-    def _update_progress(self, page_num: int, success: bool, articles_count: int, progress_filename: str):
-        """更新进度"""
+    def _update_progress(self, page_num: int, success: bool, articles_count: int, progress_filename: str,
+                         snapshot: Dict = None):
+        """
+        更新进度
+        
+        snapshot 为该页本次抓取时看到的 {'total': 结果总数, 'links': [链接...]}，
+        按页追加保存在 page_snapshots 中，供抓取后的漂移检测使用。
+        """
         with self.progress_lock:
-            progress = self._load_progress(progress_filename)
+            progress = self._load_progress(progress_filename, quiet=True)
             
             if success:
-                # 添加到已完成列表
+                if snapshot:
+                    snapshot['fetched_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    progress.setdefault('page_snapshots', {}).setdefault(str(page_num), []).append(snapshot)
+                
+                # 添加到已完成列表（重新抓取的页面不重复计数）
                 completed = progress.get('completed_pages', [])
-                if page_num not in completed:
+                if page_num in completed:
+                    articles_count = 0
+                else:
                     completed.append(page_num)
                 progress['completed_pages'] = completed
                 
@@ -499,6 +3136,104 @@ class UKBiobankScraperSelenium:
             
             self._save_progress(progress, progress_filename)
 
+    def _listing_drift_window(self, progress: Dict, result_total: int) -> List[int]:
+        """
+        根据各页抓取时看到的结果总数，找出需要重新抓取的页面（按当前页码）
+        
+        新文章总是插入在列表最前面：某页抓取时总数为 T，当前总数为 N，则该页的
+        文章现在整体后移了 N - T 个位置。把所有已抓取页映射到当前位置后，
+        未被覆盖的位置所在的页面需要重新抓取；相邻页面实际重叠的链接数与
+        按总数推算的不一致时（如中间插入或删除），这两页所在的窗口也需要重新抓取。
+        """
+        size = self.PAGE_SIZE
+        default_total = progress.get('result_total') or result_total
+        snapshots = progress.get('page_snapshots', {})
+        covered = bytearray(result_total)
+        latest = {}  # page -> (当前位置起点, 链接列表)
+        for page in progress.get('completed_pages', []):
+            page_snapshots = snapshots.get(str(page)) or [{}]
+            for snapshot in page_snapshots:
+                links = snapshot.get('links')
+                start = (page - 1) * size + result_total - snapshot.get('total', default_total)
+                for pos in range(max(start, 0), min(start + (len(links) if links is not None else size), result_total)):
+                    covered[pos] = 1
+            if page_snapshots[-1].get('links') is not None:
+                snapshot = page_snapshots[-1]
+                latest[page] = ((page - 1) * size + result_total - snapshot.get('total', default_total),
+                                snapshot['links'])
+        
+        affected = {pos // size + 1 for pos in range(result_total) if not covered[pos]}
+        for page, (start, links) in latest.items():
+            if page + 1 not in latest:
+                continue
+            next_start, next_links = latest[page + 1]
+            expected = max(0, min(start + len(links), next_start + len(next_links)) - max(start, next_start))
+            if len(set(links) & set(next_links)) != expected:
+                first = max(min(start, next_start), 0) // size + 1
+                last = max(start + len(links), next_start + len(next_links)) // size + 1
+                affected.update(range(first, last + 1))
+        
+        max_page = (result_total + size - 1) // size
+        return sorted(p for p in affected if 1 <= p <= max_page)
+    
+    def _reconcile_listing(self, csv_filename: str, progress_filename: str, max_workers: int,
+                           max_rounds: int = 5) -> Dict[str, any]:
+        """
+        第一阶段结束后重新读取结果总数，检测抓取期间的数量漂移并只重新抓取受影响的页面，
+        直到总数稳定且所有位置都被覆盖（或达到最大轮数）
+        
+        Returns:
+            {'complete', 'result_total', 'unique_links', 'rounds', 'refetched_pages'}
+        """
+        report = {'complete': False, 'result_total': None, 'unique_links': 0, 'rounds': 0, 'refetched_pages': []}
+        for round_num in range(max_rounds + 1):
+            if self.should_stop:
+                break
+            result_total = self._read_result_total()
+            if result_total is None:
+                print("无法读取当前结果总数，跳过漂移检测")
+                break
+            report['result_total'] = result_total
+            progress = self._load_progress(progress_filename, quiet=True)
+            window = self._listing_drift_window(progress, result_total)
+            if not window:
+                report['complete'] = True
+                break
+            if round_num == max_rounds:
+                break
+            
+            report['rounds'] = round_num + 1
+            baseline = progress.get('result_total')
+            print(f"\n漂移校正第 {round_num + 1} 轮: 当前结果总数 {result_total}"
+                  f"{f'（开始时 {baseline}）' if baseline else ''}，重新抓取 {len(window)} 页: "
+                  f"{window[:10]}{'...' if len(window) > 10 else ''}")
+            report['refetched_pages'].extend(window)
+            jobs = [(page_num, csv_filename, progress_filename) for page_num in window]
+            for job, result, error in self._iter_completed('listing', jobs, max_workers):
+                if error or not result['success']:
+                    self.status.log(f"✗ 第 {job[0]} 页重新抓取失败: {error or result['error']}")
+        
+        # 完整性统计：全部快照中的唯一链接数与站点结果总数对比
+        with self.progress_lock:
+            progress = self._load_progress(progress_filename, quiet=True)
+            links = set()
+            for page_snapshots in progress.get('page_snapshots', {}).values():
+                for snapshot in page_snapshots:
+                    links.update(snapshot.get('links', []))
+            report['unique_links'] = len(links)
+            report['checked_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if report['result_total']:
+                progress['total_pages'] = (report['result_total'] + self.PAGE_SIZE - 1) // self.PAGE_SIZE
+            progress['listing_check'] = report
+            self._save_progress(progress, progress_filename)
+        
+        if report['complete']:
+            print(f"✓ 列表完整性校验通过: 结果总数 {report['result_total']}，已收集唯一链接 {report['unique_links']} 个")
+        elif report['result_total'] is not None:
+            print(f"⚠ 列表仍不稳定（{report['rounds']} 轮校正后），结果总数 {report['result_total']}，"
+                  f"已收集唯一链接 {report['unique_links']} 个，下次运行将继续校正")
+        return report
+    
     def _fetch_page_links_only(self, page_num: int, csv_filename: str, progress_filename: str) -> Dict[str, any]:
         """
         第一阶段：只获取页面中的文章链接，不获取详情
@@ -511,7 +3246,27 @@ class UKBiobankScraperSelenium:
         Returns:
             包含爬取结果的字典 {'page': int, 'success': bool, 'articles_count': int, 'error': str}
         """
-        driver = None
+        # 检查是否应该停止
+        if self.should_stop:
+            return {'page': page_num, 'success': False, 'articles_count': 0, 'error': "程序已停止"}
+        
+        try:
+            # 构建URL并访问
+            html = self._render_page(self._listing_url(page_num), 3)
+        except Exception as e:
+            # 更新失败进度
+            self._update_progress(page_num, False, 0, progress_filename)
+            return {'page': page_num, 'success': False, 'articles_count': 0, 'error': str(e)}
+        
+        return self._process_listing_html(page_num, html, csv_filename, progress_filename)
+    
+    def _listing_url(self, page_num: int) -> str:
+        """列表页地址"""
+        return f"{self.base_url}?_publication_date=2020-01-01%2C&_paged={page_num}"
+    
+    def _process_listing_html(self, page_num: int, html: str, csv_filename: str,
+                              progress_filename: str) -> Dict[str, any]:
+        """解析列表页HTML，写入占位行并更新进度（各浏览器后端共用）"""
         result = {
             'page': page_num,
             'success': False,
@@ -520,29 +3275,6 @@ class UKBiobankScraperSelenium:
         }
         
         try:
-            # 检查是否应该停止
-            if self.should_stop:
-                result['error'] = "程序已停止"
-                return result
-            
-            # 创建独立的浏览器实例
-            driver = self._create_driver(self.headless)
-            
-            if not driver:
-                result['error'] = "无法创建浏览器实例"
-                return result
-            
-            # 将驱动添加到活跃列表
-            self.active_drivers.append(driver)
-            
-            # 构建URL并访问
-            url = f"{self.base_url}?_publication_date=2020-01-01%2C&_paged={page_num}"
-            driver.get(url)
-            time.sleep(3)
-            
-            # 获取页面HTML
-            html = driver.page_source
-            
             if not html:
                 result['error'] = "获取HTML失败"
                 return result
@@ -577,9 +3309,13 @@ class UKBiobankScraperSelenium:
             
             result['success'] = True
             result['articles_count'] = len(valid_articles)
+            result['result_total'] = self._parse_result_total(soup)
             
-            # 更新进度
-            self._update_progress(page_num, True, len(valid_articles), progress_filename)
+            # 更新进度（记录本页看到的结果总数和链接，用于漂移检测）
+            snapshot = {'links': [pub['link'] for pub in valid_articles]}
+            if result['result_total'] is not None:
+                snapshot['total'] = result['result_total']
+            self._update_progress(page_num, True, len(valid_articles), progress_filename, snapshot)
             
             # 更新计数器
             with self.progress_lock:
@@ -593,17 +3329,8 @@ class UKBiobankScraperSelenium:
             # 更新失败进度
             self._update_progress(page_num, False, 0, progress_filename)
             return result
-        finally:
-            # 确保关闭浏览器实例
-            if driver:
-                try:
-                    driver.quit()
-                    if driver in self.active_drivers:
-                        self.active_drivers.remove(driver)
-                except:
-                    pass
     
-    def _fetch_article_details_simple(self, pub_info: Dict[str, str], csv_filename: str) -> bool:
+    def _fetch_article_details_simple(self, pub_info: Publication, csv_filename: str) -> bool:
         """
         简化版获取文章详情（使用独立浏览器，用于页面级并发）
         
@@ -614,20 +3341,46 @@ class UKBiobankScraperSelenium:
         Returns:
             是否成功
         """
-        driver = None
+        if self.should_stop:
+            return False
+        
+        # 熔断打开时等待冷却
+        if not self.circuit_breaker.wait_until_closed(lambda: self.should_stop):
+            return False
+        
         try:
-            # 创建独立的浏览器实例
-            driver = self._create_driver(self.headless)
-            
-            if not driver:
-                return False
-            
             # 访问详情页
-            driver.get(pub_info['link'])
-            time.sleep(2)
-            
-            # 获取页面HTML
-            html = driver.page_source
+            html = self._render_page(pub_info['link'], 2)
+        except BrowserUnavailableError as e:
+            # 本地浏览器故障，不计入该链接的失败次数
+            self.status.log(f"  [获取详情] 失败: {e}")
+            return False
+        except Exception as e:
+            self._record_detail_failure(pub_info, csv_filename, e)
+            return False
+        
+        return self._process_detail_html(pub_info, html, csv_filename)
+    
+    def _record_detail_failure(self, pub_info: Publication, csv_filename: str, error: Exception):
+        """记录详情获取失败（熔断器 + 重试状态）"""
+        tracker = self._get_retry_tracker(csv_filename)
+        self.status.log(f"  [获取详情] 失败: {error}")
+        self.circuit_breaker.record(False)
+        if tracker.record_failure(pub_info['link'], error, pub_info.get('title', '')):
+            self.status.log(f"  [获取详情] 已连续失败 {tracker.max_attempts} 次，转入死信表: {pub_info['link']}")
+    
+    def _process_detail_html(self, pub_info: Publication, html: str, csv_filename: str) -> bool:
+        """
+        解析详情页HTML并保存（各浏览器后端共用）
+        
+        先比较 articleHeader 与摘要区域的内容指纹，与上次写入时相同则跳过字段提取和写入。
+        
+        Returns:
+            是否成功
+        """
+        tracker = self._get_retry_tracker(csv_filename)
+        fingerprints = self._get_fingerprints(csv_filename)
+        try:
             soup = BeautifulSoup(html, 'html.parser')
             
             # 提取详细信息
@@ -644,113 +3397,179 @@ class UKBiobankScraperSelenium:
             
             # 提取articleHeader的三个部分
             article_header = soup.find('header', class_='articleHeader')
-            if article_header:
-                # 第一部分：articleHeader__tags - Disease areas
-                tags_section = article_header.find('div', class_='articleHeader__tags')
-                if tags_section:
-                    # 查找Disease areas
-                    disease_areas_dt = tags_section.find('dt', string=lambda x: x and 'disease areas' in x.lower() if x else False)
-                    if disease_areas_dt:
-                        disease_areas_dd = disease_areas_dt.find_next_sibling('dd')
-                        if disease_areas_dd:
-                            # 提取所有tag
-                            tag_elements = disease_areas_dd.find_all('span', class_='tag')
-                            details['disease_areas'] = [tag.get_text(strip=True) for tag in tag_elements]
-                
-                # 第二部分：articleHeader__date - Last updated
-                date_section = article_header.find('div', class_='articleHeader__date')
-                if date_section:
-                    last_updated_dt = date_section.find('dt', string=lambda x: x and 'last updated' in x.lower() if x else False)
-                    if last_updated_dt:
-                        last_updated_dd = last_updated_dt.find_next_sibling('dd')
-                        if last_updated_dd:
-                            time_elem = last_updated_dd.find('time')
-                            if time_elem:
-                                details['last_updated'] = time_elem.get_text(strip=True)
-                
-                # 第三部分：articleHeader__meta - 作者、发布日期、期刊、PubMed ID、DOI
-                meta_section = article_header.find('div', class_='articleHeader__meta')
-                if meta_section:
-                    meta_items = meta_section.find_all('div', class_='meta__item')
-                    for item in meta_items:
-                        dt = item.find('dt')
-                        dd = item.find('dd')
-                        if dt and dd:
-                            dt_text = dt.get_text(strip=True).lower()
-                            dd_text = dd.get_text(strip=True)
-                            
-                            if 'author' in dt_text:
-                                details['authors'] = dd_text
-                            elif 'publish date' in dt_text:
-                                details['publish_date'] = dd_text
-                            elif 'journal' in dt_text:
-                                details['journal'] = dd_text
-                            elif 'pubmed id' in dt_text:
-                                details['pubmed_id'] = dd_text
-                            elif 'doi' in dt_text:
-                                doi_link = dd.find('a')
-                                if doi_link:
-                                    details['doi'] = doi_link.get_text(strip=True)
-                                else:
-                                    details['doi'] = dd_text
-            
-            # 提取摘要
-            abstract_parts = []
-            abstract_header = soup.find('h2', string=lambda x: x and 'abstract' in x.lower() if x else False)
-            
-            if abstract_header:
-                current = abstract_header.find_next_sibling()
-                while current:
-                    if current.name in ['h2', 'h3', 'h4']:
-                        break
-                    if current.name == 'p':
-                        text = current.get_text(strip=True)
-                        if text:
-                            abstract_parts.append(text)
-                    current = current.find_next_sibling()
-            
+            if not article_header:
+                # 缺少文章头部通常意味着被限流或返回了验证页
+                raise Exception("页面缺少articleHeader（可能被限流或拦截）")
+            
+            abstract_parts = self._extract_abstract_parts(soup)
+            digest = ContentFingerprints.fingerprint(article_header, abstract_parts)
+            # 只有CSV中已有详情字段时才能复用（占位行或清空过的CSV需要重新提取）
+            change = fingerprints.compare(pub_info['link'], digest)
+            if change == 'unchanged' and not (pub_info['last_updated'] or pub_info['disease_areas']):
+                change = 'new'
+            fingerprints.count(change)
+            if change == 'unchanged':
+                if pub_info['details_saved'] != '是':
+                    # 内容未变化但被重新标记为待获取（如站点地图 lastmod 变化），只恢复完成标记
+                    pub_info['details_saved'] = '是'
+                    self.upsert_to_csv(Publication(link=pub_info['link'], details_saved='是'), csv_filename)
+                    if self.record_sink:
+                        self.record_sink(pub_info)
+                tracker.record_success(pub_info['link'])
+                self.circuit_breaker.record(True)
+                return True
+            
+            # 第一部分：articleHeader__tags - Disease areas
+            tags_section = article_header.find('div', class_='articleHeader__tags')
+            if tags_section:
+                # 查找Disease areas
+                disease_areas_dt = tags_section.find('dt', string=lambda x: x and 'disease areas' in x.lower() if x else False)
+                if disease_areas_dt:
+                    disease_areas_dd = disease_areas_dt.find_next_sibling('dd')
+                    if disease_areas_dd:
+                        # 提取所有tag
+                        tag_elements = disease_areas_dd.find_all('span', class_='tag')
+                        details['disease_areas'] = [tag.get_text(strip=True) for tag in tag_elements]
+            
+            # 第二部分：articleHeader__date - Last updated
+            date_section = article_header.find('div', class_='articleHeader__date')
+            if date_section:
+                last_updated_dt = date_section.find('dt', string=lambda x: x and 'last updated' in x.lower() if x else False)
+                if last_updated_dt:
+                    last_updated_dd = last_updated_dt.find_next_sibling('dd')
+                    if last_updated_dd:
+                        time_elem = last_updated_dd.find('time')
+                        if time_elem:
+                            details['last_updated'] = time_elem.get_text(strip=True)
+            
+            # 第三部分：articleHeader__meta - 作者、发布日期、期刊、PubMed ID、DOI
+            meta_section = article_header.find('div', class_='articleHeader__meta')
+            if meta_section:
+                meta_items = meta_section.find_all('div', class_='meta__item')
+                for item in meta_items:
+                    dt = item.find('dt')
+                    dd = item.find('dd')
+                    if dt and dd:
+                        dt_text = dt.get_text(strip=True).lower()
+                        dd_text = dd.get_text(strip=True)
+                        
+                        if 'author' in dt_text:
+                            details['authors'] = dd_text
+                        elif 'publish date' in dt_text:
+                            details['publish_date'] = dd_text
+                        elif 'journal' in dt_text:
+                            details['journal'] = dd_text
+                        elif 'pubmed id' in dt_text:
+                            details['pubmed_id'] = dd_text
+                        elif 'doi' in dt_text:
+                            doi_link = dd.find('a')
+                            if doi_link:
+                                details['doi'] = doi_link.get_text(strip=True)
+                            else:
+                                details['doi'] = dd_text
+            
+            # 摘要
             if abstract_parts:
                 details['abstract'] = ' '.join(abstract_parts)
             else:
                 details['abstract'] = '未找到摘要'
             
+            # 与列表页的发布日期筛选保持一致（站点地图发现的链接此时才知道发布日期）
+            if self._outside_date_filter(details['publish_date']):
+                self._exclude_publications([pub_info['link']], csv_filename)
+                self.status.log(f"  [获取详情] 发布日期 {details['publish_date']} 早于筛选条件，已排除: {pub_info['link']}")
+                tracker.record_success(pub_info['link'])
+                self.circuit_breaker.record(True)
+                return True
+            
+            # 站点地图发现的链接没有标题，从详情页补全
+            if not pub_info['title']:
+                title_elem = soup.find('h1')
+                if title_elem:
+                    details['title'] = title_elem.get_text(strip=True)
+            
             # 更新文章信息与详情完成标记
             pub_info.update(details)
             pub_info['details_saved'] = '是'
             
-            # 保存/更新到CSV（按link去重）
+            # 保存/更新到CSV（按link去重），写入后再记录指纹
             self.upsert_to_csv(pub_info, csv_filename)
+            fingerprints.update(pub_info['link'], digest)
             
+            tracker.record_success(pub_info['link'])
+            self.circuit_breaker.record(True)
+            if self.record_sink:
+                self.record_sink(pub_info)
             return True
             
         except Exception as e:
-            print(f"  [获取详情] 失败: {e}")
+            self._record_detail_failure(pub_info, csv_filename, e)
             return False
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+    
+    @staticmethod
+    def _extract_abstract_parts(soup) -> List[str]:
+        """提取 Abstract 标题之后、下一个标题之前的段落文本"""
+        abstract_parts = []
+        abstract_header = soup.find('h2', string=lambda x: x and 'abstract' in x.lower() if x else False)
+        
+        if abstract_header:
+            current = abstract_header.find_next_sibling()
+            while current:
+                if current.name in ['h2', 'h3', 'h4']:
+                    break
+                if current.name == 'p':
+                    text = current.get_text(strip=True)
+                    if text:
+                        abstract_parts.append(text)
+                current = current.find_next_sibling()
+        return abstract_parts
+    
+    def _export_json(self, csv_filename: str, json_filename: str) -> List[Publication]:
+        """由CSV生成JSON文件，返回全部记录"""
+        final_data = []
+        try:
+            if os.path.exists(csv_filename):
+                with self.file_lock:
+                    final_data = load_publications_csv(csv_filename)
+                
+                with open(json_filename, 'w', encoding='utf-8') as f:
+                    json.dump([p.to_dict() for p in final_data], f, ensure_ascii=False, indent=2)
+                
+                print(f"✓ JSON文件生成成功")
+        except Exception as e:
+            print(f"✗ JSON文件生成失败: {e}")
+        return final_data
     
     def scrape_all_pages_concurrent(self, csv_filename: str = 'publications.csv', 
                                     json_filename: str = 'publications.json', max_workers: int = 3,
-                                    resume: bool = True) -> Dict[str, any]:
+                                    resume: bool = True, discovery: str = 'listing',
+                                    sitemap_url: str = None, time_budget: float = None,
+                                    recheck: bool = False, refresh: bool = False) -> Dict[str, any]:
         """
         使用两阶段爬取：先获取所有文章链接，再获取详情（支持断点续传）
         
         Args:
             csv_filename: CSV文件名
             json_filename: JSON文件名
-            max_workers: 最大并发页面数（建议3-5）
+            max_workers: 最大并发页面数（建议3-5；'tabs'/'cdp' 模式下由 tabs_per_browser 决定）
             resume: 是否启用断点续传
+            discovery: 链接发现方式，'listing' 逐页渲染列表页，'sitemap' 读取XML站点地图
+            sitemap_url: 站点地图地址（discovery='sitemap' 时使用）
+            time_budget: 本次运行的时间预算（秒），到期前按优先级处理尽可能多的任务，其余留待下次
+            recheck: 是否重新获取已完成但缺少摘要/DOI/PMID的文章详情
+            refresh: 是否刷新全部已完成文章，按内容指纹只写入有变化的记录
             
         Returns:
             包含统计信息的字典
         """
         progress_filename = csv_filename.replace('.csv', '_progress.json')
+        self.deadline = time.time() + time_budget if time_budget else None
         
         try:
+            if discovery == 'sitemap':
+                return self._scrape_via_sitemap(csv_filename, json_filename, max_workers, sitemap_url,
+                                                recheck=recheck, refresh=refresh)
+            
             # 获取总页数
             print(f"\n步骤 1: 检测总页数...")
             total_pages = self.get_total_pages()
@@ -776,26 +3595,31 @@ class UKBiobankScraperSelenium:
                     print(f"  - 失败页面: {len(progress.get('failed_pages', []))} 页")
                     
                     if not pending_pages:
-                        print("\n✓ 所有页面链接已获取完成，进入详情获取阶段")
+                        print("\n✓ 所有页面链接已获取完成，检查站点结果是否有变化...")
+                        listing_check = self._reconcile_listing(csv_filename, progress_filename, max_workers)
+                        print("\n进入详情获取阶段")
                         # 直接进入第二阶段
-                        detail_result = self.fetch_all_article_details(csv_filename, max_workers=max_workers)
-                        return {'success': True, 'stage': 'details_only', 'detail_result': detail_result}
+                        detail_result = self.fetch_all_article_details(csv_filename, max_workers=max_workers,
+                                                                       recheck=recheck, refresh=refresh)
+                        return {'success': True, 'stage': 'details_only', 'listing_check': listing_check,
+                                'detail_result': detail_result}
                 else:
                     print("\n首次运行模式（保留现有数据）")
             else:
                 print("\n全新开始模式")
                 # 只有在全新开始模式下才清空现有文件
-            if os.path.exists(csv_filename):
-                os.remove(csv_filename)
-            if os.path.exists(json_filename):
-                os.remove(json_filename)
-                if os.path.exists(progress_filename):
-                    os.remove(progress_filename)
+                # 内容指纹与PubMed请求记录描述的是CSV中的记录，随CSV一起清空
+                for filename in [csv_filename, json_filename, progress_filename,
+                                 csv_filename.replace('.csv', '_fingerprints.json'),
+                                 csv_filename.replace('.csv', '_pubmed.json')]:
+                    if os.path.exists(filename):
+                        os.remove(filename)
             
             # 初始化进度文件
             if not progress:
                 progress = {
                     'total_pages': total_pages,
+                    'result_total': self.result_total,
                     'completed_pages': [],
                     'failed_pages': [],
                     'total_articles': 0,
@@ -817,55 +3641,42 @@ class UKBiobankScraperSelenium:
             
             start_time = time.time()
             
-            # 使用线程池并发爬取页面
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 提交待处理页面任务
-                future_to_page = {}
-                for page_num in pending_pages:
-                    if self.should_stop:
-                        print("\n检测到停止信号，取消剩余任务...")
-                        break
-                        
-                    future = executor.submit(
-                        self._fetch_page_links_only,
-                        page_num,
-                        csv_filename,
-                        progress_filename
-                    )
-                    future_to_page[future] = page_num
-                
-                # 处理完成的任务
-                successful_pages = len(progress.get('completed_pages', []))
-                failed_pages = len(progress.get('failed_pages', []))
-                
-                for future in as_completed(future_to_page):
-                    if self.should_stop:
-                        print("\n正在安全停止...")
-                        break
-                        
-                    page_num = future_to_page[future]
-                    try:
-                        result = future.result()
-                        
-                        if result['success']:
-                            successful_pages += 1
-                            print(f"✓ 第 {result['page']}/{total_pages} 页链接获取完成 | "
-                                  f"文章数: {result['articles_count']} | "
-                                  f"累计: {self.articles_completed} 篇 | "
-                                  f"进度: {self.pages_completed}/{total_pages}")
-                        else:
-                            failed_pages += 1
-                            print(f"✗ 第 {result['page']}/{total_pages} 页链接获取失败: {result['error']}")
-                        
-                    except Exception as e:
-                        failed_pages += 1
-                        print(f"✗ 第 {page_num}/{total_pages} 页链接获取异常: {e}")
-                        
-                        # 更新失败页面进度
-                        self._update_progress(page_num, False, 0, progress_filename)
+            # 并发爬取待处理页面
+            successful_pages = len(progress.get('completed_pages', []))
+            failed_pages = len(progress.get('failed_pages', []))
+            # 按优先级排序：新页面在前，曾失败的页面略微提前
+            scheduler = self._get_scheduler(csv_filename)
+            pending_pages = scheduler.plan_listing(pending_pages, total_pages, progress.get('failed_pages', []))
+            jobs = [(page_num, csv_filename, progress_filename) for page_num in pending_pages]
+            
+            drift_reported = False
+            for job, result, error in self._iter_completed('listing', jobs, max_workers, scheduler):
+                page_num = job[0]
+                seen_total = result.get('result_total') if result else None
+                if seen_total is not None and self.result_total is not None and seen_total != self.result_total \
+                        and not drift_reported:
+                    drift_reported = True
+                    self.status.log(f"⚠ 抓取过程中结果总数变化: {self.result_total} → {seen_total}，"
+                                    f"结束后将重新抓取受影响的页面")
+                if error:
+                    failed_pages += 1
+                    self.status.log(f"✗ 第 {page_num}/{total_pages} 页链接获取异常: {error}")
+                    
+                    # 更新失败页面进度
+                    self._update_progress(page_num, False, 0, progress_filename)
+                elif result['success']:
+                    successful_pages += 1
+                else:
+                    failed_pages += 1
+                    self.status.log(f"✗ 第 {result['page']}/{total_pages} 页链接获取失败: {result['error']}")
             
             elapsed_time = time.time() - start_time
             
+            if self.should_stop:
+                print("\n程序已停止，进度已保存")
+                return {'success': False, 'error': '程序已停止', 'stage': 'links',
+                        'successful_pages': successful_pages, 'failed_pages': failed_pages}
+            
             # 第一阶段补偿：重试失败的页面
             print("\n执行第一阶段补偿: 重试失败的页面...")
             try:
@@ -873,6 +3684,11 @@ class UKBiobankScraperSelenium:
             except Exception as e:
                 print(f"第一阶段补偿执行出错: {e}")
             
+            # 漂移校正：抓取期间有新文章插入时，只重新抓取受影响的页面窗口
+            listing_check = self._reconcile_listing(csv_filename, progress_filename, max_workers)
+            if listing_check.get('result_total'):
+                total_pages = (listing_check['result_total'] + self.PAGE_SIZE - 1) // self.PAGE_SIZE
+            
             print("\n" + "=" * 80)
             print("第一阶段完成 - 所有文章链接已获取！")
             print("=" * 80)
@@ -884,25 +3700,13 @@ class UKBiobankScraperSelenium:
             
             # 第二阶段：获取所有文章的详细信息
             print("\n步骤 3: 开始第二阶段 - 获取所有文章详细信息...")
-            detail_result = self.fetch_all_article_details(csv_filename, max_workers=max_workers)
+            detail_result = self.fetch_all_article_details(csv_filename, max_workers=max_workers,
+                                                           recheck=recheck, refresh=refresh)
             
             # 生成JSON文件
             print("\n步骤 4: 生成JSON文件...")
             
-            try:
-                final_data = []
-                if os.path.exists(csv_filename):
-                    with open(csv_filename, 'r', encoding='utf-8-sig') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            final_data.append(row)
-                    
-                    with open(json_filename, 'w', encoding='utf-8') as f:
-                        json.dump(final_data, f, ensure_ascii=False, indent=2)
-                    
-                    print(f"✓ JSON文件生成成功")
-            except Exception as e:
-                print(f"✗ JSON文件生成失败: {e}")
+            final_data = self._export_json(csv_filename, json_filename)
             
             # 最终统计信息
             print("\n" + "=" * 80)
@@ -924,12 +3728,188 @@ class UKBiobankScraperSelenium:
                 print(f"  - 有摘要: {len([p for p in final_data if p.get('abstract') and p['abstract'] not in ['未找到摘要', '获取失败']])} 篇")
                 print(f"  - 有DOI: {len([p for p in final_data if p.get('doi')])} 篇")
                 print(f"  - 有PubMed ID: {len([p for p in final_data if p.get('pubmed_id')])} 篇")
-                print(f"  - 有疾病领域: {len([p for p in final_data if p.get('disease_areas') and p['disease_areas'] != ''])} 篇")
+                print(f"  - 有疾病领域: {len([p for p in final_data if p.get('disease_areas')])} 篇")
                 print(f"  - 有作者信息: {len([p for p in final_data if p.get('authors')])} 篇")
             
+            return {
+                'success': True,
+                'stage': 'complete',
+                'total_pages': total_pages,
+                'successful_pages': successful_pages,
+                'failed_pages': failed_pages,
+                'total_articles': self.articles_completed,
+                'listing_check': listing_check,
+                'detail_result': detail_result,
+                'elapsed_time': elapsed_time + detail_result.get('elapsed_time', 0)
+            }
+            
+        except Exception as e:
+            print(f"\n程序执行出错: {e}")
+            return {'success': False, 'error': str(e)}
+        finally:
+            self.deadline = None
+    
+    def _scrape_via_sitemap(self, csv_filename: str, json_filename: str, max_workers: int,
+                            sitemap_url: str = None, recheck: bool = False,
+                            refresh: bool = False) -> Dict[str, any]:
+        """站点地图模式：发现新增/更新链接后直接进入详情阶段"""
+        try:
+            print(f"\n步骤 1: 从站点地图发现文章链接...")
+            discovery_result = self.discover_from_sitemap(csv_filename, sitemap_url)
+            if not discovery_result['success']:
+                return {'success': False, 'error': discovery_result.get('error', '站点地图读取失败')}
+            
+            print("\n步骤 2: 获取新增/更新文章的详细信息...")
+            detail_result = self.fetch_all_article_details(csv_filename, max_workers=max_workers,
+                                                           recheck=recheck, refresh=refresh)
+            
+            print("\n步骤 3: 生成JSON文件...")
+            self._export_json(csv_filename, json_filename)
+            return {'success': True, 'stage': 'sitemap', 'discovery_result': discovery_result,
+                    'detail_result': detail_result}
         except Exception as e:
             print(f"\n程序执行出错: {e}")
             return {'success': False, 'error': str(e)}
+    
+    def iter_publications(self, csv_filename: str = 'publications.csv', json_filename: str = 'publications.json',
+                          max_workers: int = 3, resume: bool = True, discovery: str = 'listing',
+                          sitemap_url: str = None, buffer_size: int = None, include_existing: bool = False,
+                          time_budget: float = None, recheck: bool = False, refresh: bool = False):
+        """
+        以生成器形式逐条产出完成详情抓取的出版物记录（抓取在后台线程进行）
+        
+        缓冲区满时抓取线程会阻塞等待，消费者处理慢时自动降速；消费者提前
+        break 时会停止抓取并等待进行中的浏览器关闭，已写入CSV但未交给消费者的
+        记录会重新标记为待获取，下次运行时再次产出。进度文件与CSV照常写入，
+        因此与 scrape_all_pages_concurrent 共用同一份断点续传状态。
+        
+        Args:
+            csv_filename: CSV文件名（断点续传状态）
+            json_filename: JSON文件名
+            max_workers: 最大并发数
+            resume: 是否启用断点续传
+            discovery: 链接发现方式（'listing' 或 'sitemap'）
+            sitemap_url: 站点地图地址
+            buffer_size: 缓冲区大小，默认 max_workers * 2
+            include_existing: 是否先产出CSV中此前已完成的记录
+            time_budget: 时间预算（秒），见 scrape_all_pages_concurrent
+            recheck: 是否重新获取缺字段的已完成记录
+            refresh: 是否刷新全部已完成记录（只产出内容有变化的记录）
+            
+        Yields:
+            Publication 记录
+        """
+        if include_existing:
+            with self.file_lock:
+                existing = [p for p in load_publications_csv(csv_filename) if p.details_saved == '是']
+            yield from existing
+        
+        buffer = queue.Queue(maxsize=buffer_size or max_workers * 2)
+        done = object()
+        outcome = {}
+        consumer_gone = threading.Event()
+        previous_sink = self.record_sink
+        sunk_links = set()       # 已标记完成并交给缓冲区的记录
+        delivered_links = set()  # 已交给消费者的记录
+        
+        def sink(pub):
+            sunk_links.add(pub.link)
+            # 缓冲区满时阻塞抓取线程（背压），停止后放弃
+            while not self.should_stop and not consumer_gone.is_set():
+                try:
+                    buffer.put(pub.copy(), timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        def run():
+            try:
+                outcome['result'] = self.scrape_all_pages_concurrent(
+                    csv_filename=csv_filename,
+                    json_filename=json_filename,
+                    max_workers=max_workers,
+                    resume=resume,
+                    discovery=discovery,
+                    sitemap_url=sitemap_url,
+                    time_budget=time_budget,
+                    recheck=recheck,
+                    refresh=refresh
+                )
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                while not consumer_gone.is_set():
+                    try:
+                        buffer.put(done, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        
+        self.record_sink = sink
+        worker = threading.Thread(target=run, name='publication-crawler', daemon=True)
+        worker.start()
+        finished = False
+        try:
+            while True:
+                item = buffer.get()
+                if item is done:
+                    finished = True
+                    break
+                delivered_links.add(item.link)
+                yield item
+            if 'error' in outcome:
+                raise outcome['error']
+            self.last_result = outcome.get('result')
+        finally:
+            if not finished:
+                # 提前退出：通知抓取线程停止，清空缓冲区以解除阻塞
+                print("\n消费者已停止读取，正在停止抓取...")
+                was_stopped = self.should_stop
+                self.should_stop = True
+                consumer_gone.set()
+                while worker.is_alive():
+                    try:
+                        buffer.get(timeout=0.5)
+                    except queue.Empty:
+                        pass
+                worker.join()
+                self.should_stop = was_stopped
+                # 缓冲区中或进行中被丢弃的记录已写为完成，重新标记为待获取
+                undelivered = sunk_links - delivered_links
+                if undelivered:
+                    self.upsert_many_to_csv(
+                        [Publication(link=link, details_saved='否') for link in undelivered], csv_filename
+                    )
+                    print(f"已将 {len(undelivered)} 篇未交付的记录重新标记为待获取")
+            self.record_sink = previous_sink
+    
+    async def aiter_publications(self, **kwargs):
+        """
+        iter_publications 的异步版本（参数相同）
+        
+        抓取仍在后台线程中进行，每条记录通过 loop.run_in_executor 在线程池中取出，不阻塞事件循环。
+        """
+        loop = asyncio.get_running_loop()
+        iterator = self.iter_publications(**kwargs)
+        done = object()
+        pending = None
+        try:
+            while True:
+                pending = loop.run_in_executor(None, next, iterator, done)
+                item = await asyncio.shield(pending)
+                pending = None
+                if item is done:
+                    break
+                yield item
+        finally:
+            # 被取消时先等正在执行的 next() 返回，再关闭生成器
+            if pending is not None:
+                try:
+                    await pending
+                except Exception:
+                    pass
+            await loop.run_in_executor(None, iterator.close)
+    
     def close(self):
         """关闭浏览器和清理资源"""
         self.should_stop = True
@@ -956,6 +3936,9 @@ def main_concurrent():
         csv_filename = 'publications_2020_concurrent.csv'
         json_filename = 'publications_2020_concurrent.json'
         
+        # 启用全文索引（写CSV时同步更新）
+        scraper.attach_search_index(csv_filename.replace('.csv', '_index.db'), csv_filename)
+        
         # 使用并发爬取（支持断点续传）
         result = scraper.scrape_all_pages_concurrent(
             csv_filename=csv_filename,
@@ -964,8 +3947,8 @@ def main_concurrent():
             resume=True     # 启用断点续传
         )
         
-        if not result['success']:
-            print(f"爬取失败: {result.get('error', '未知错误')}")
+        if not result or not result['success']:
+            print(f"爬取失败: {(result or {}).get('error', '未知错误')}")
         elif result.get('message'):
             print(result['message'])
             
@@ -983,9 +3966,60 @@ def main_concurrent():
             scraper.close()
 
 
+def main_search(argv: List[str]):
+    """全文检索命令行：python ukbiobank_scraper.py search "proteomics" --disease-area ... --from 2023"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='ukbiobank_scraper.py search', description='检索已抓取的出版物')
+    parser.add_argument('query', nargs='?', default='', help='关键词（多个词之间为AND）')
+    parser.add_argument('--db', default='publications_2020_concurrent_index.db', help='索引文件')
+    parser.add_argument('--rebuild-from', metavar='CSV', help='检索前先从CSV全量重建索引')
+    parser.add_argument('--disease-area', help='按疾病领域筛选')
+    parser.add_argument('--journal', help='按期刊筛选')
+    parser.add_argument('--from', dest='date_from', help='发布日期下限（YYYY 或 YYYY-MM-DD）')
+    parser.add_argument('--to', dest='date_to', help='发布日期上限（YYYY 或 YYYY-MM-DD）')
+    parser.add_argument('--limit', type=int, default=20, help='最多返回条数')
+    parser.add_argument('--raw', action='store_true', help='按FTS5语法解释关键词')
+    parser.add_argument('--facets', action='store_true', help='同时输出疾病领域/期刊/年份分布')
+    parser.add_argument('--json', action='store_true', help='以JSON输出')
+    args = parser.parse_args(argv)
+    
+    index = PublicationIndex(args.db)
+    try:
+        if args.rebuild_from:
+            count = index.rebuild_from_csv(args.rebuild_from)
+            print(f"✓ 已从 {args.rebuild_from} 重建索引，共 {count} 条记录")
+        filters = {'disease_area': args.disease_area, 'journal': args.journal,
+                   'date_from': args.date_from, 'date_to': args.date_to}
+        start = time.time()
+        results = index.search(args.query, limit=args.limit, raw=args.raw, **filters)
+        elapsed_ms = (time.time() - start) * 1000
+        facets = index.facets(args.query, raw=args.raw, **filters) if args.facets else None
+        
+        if args.json:
+            print(json.dumps({'results': results, 'facets': facets, 'elapsed_ms': elapsed_ms},
+                             ensure_ascii=False, indent=2))
+            return
+        
+        print(f"找到 {len(results)} 条结果（{elapsed_ms:.1f} ms）")
+        for i, row in enumerate(results, 1):
+            print(f"\n{i}. {row['title']}")
+            print(f"   {row['journal']} | {row['publish_date']} | {row['disease_areas']}")
+            print(f"   {row['link']}")
+            if row['snippet']:
+                print(f"   {row['snippet']}")
+        if facets:
+            for name, values in facets.items():
+                print(f"\n[{name}] " + ', '.join(f"{value} ({n})" for value, n in values))
+    finally:
+        index.close()
+
+
 def main():
     """主函数入口"""
-    main_concurrent()
+    if len(sys.argv) > 1 and sys.argv[1] == 'search':
+        main_search(sys.argv[2:])
+    else:
+        main_concurrent()
 
 
 if __name__ == "__main__":